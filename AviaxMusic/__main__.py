@@ -7,9 +7,22 @@ from pytgcalls.exceptions import NoActiveGroupCall
 import config
 from AviaxMusic import LOGGER, app, userbot
 from AviaxMusic.core.call import Aviax
+from AviaxMusic.core.http import close_session
+from AviaxMusic.core.mongo import ensure_indexes
+from AviaxMusic.core.ytdlp import ytdlp
 from AviaxMusic.misc import sudo
 from AviaxMusic.plugins import ALL_MODULES
-from AviaxMusic.utils.database import get_banned_users, get_gbanned
+from AviaxMusic.utils.broadcast import broadcaster
+from AviaxMusic.utils.database import (
+    flush_served,
+    iter_banned_users,
+    iter_gbanned,
+    migrate_chat_settings,
+    preload_chat_settings,
+)
+from AviaxMusic.utils.stream.journal import journal, resume_queues
+from AviaxMusic.utils.stream.progressive import stop_relay
+from AviaxMusic.utils.thumbnails import shutdown_renderer
 from config import BANNED_USERS
 
 
@@ -24,12 +37,17 @@ async def init():
         LOGGER(__name__).error("Assistant client variables not defined, exiting...")
         exit()
     await sudo()
+    await ensure_indexes()
     try:
-        users = await get_gbanned()
-        for user_id in users:
+        await migrate_chat_settings()
+        loaded = await preload_chat_settings()
+        LOGGER(__name__).info(f"Preloaded settings of {loaded} chats.")
+    except Exception as e:
+        LOGGER(__name__).warning(f"Chat settings warm-up failed: {e}")
+    try:
+        async for user_id in iter_gbanned():
             BANNED_USERS.add(user_id)
-        users = await get_banned_users()
-        for user_id in users:
+        async for user_id in iter_banned_users():
             BANNED_USERS.add(user_id)
     except:
         pass
@@ -49,12 +67,22 @@ async def init():
     except:
         pass
     await Aviax.decorators()
+    asyncio.create_task(resume_queues())
+    journal.start()
+    asyncio.create_task(broadcaster.resume())
     LOGGER("AviaxMusic").info(
         "\x41\x76\x69\x61\x78\x20\x4d\x75\x73\x69\x63\x20\x53\x74\x61\x72\x74\x65\x64\x20\x53\x75\x63\x63\x65\x73\x73\x66\x75\x6c\x6c\x79\x2e\x0a\x0a\x44\x6f\x6e\x27\x74\x20\x66\x6f\x72\x67\x65\x74\x20\x74\x6f\x20\x76\x69\x73\x69\x74\x20\x40\x4e\x65\x78\x47\x65\x6e\x42\x6f\x74\x73"
     )
     await idle()
+    await journal.stop()
+    await broadcaster.stop()
+    await flush_served()
     await app.stop()
     await userbot.stop()
+    await stop_relay()
+    await close_session()
+    ytdlp.shutdown()
+    shutdown_renderer()
     LOGGER("AviaxMusic").info("Stopping Aviax Music Bot...")
 
 
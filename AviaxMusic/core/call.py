@@ -26,9 +26,22 @@ from AviaxMusic.utils.database import (
     set_loop,
 )
 from AviaxMusic.utils.exceptions import AssistantErr
+from AviaxMusic.utils.fileids import send_photo
 from AviaxMusic.utils.formatters import check_duration, seconds_to_min, speed_converter
 from AviaxMusic.utils.inline.play import stream_markup
 from AviaxMusic.utils.stream.autoclear import auto_clean
+from AviaxMusic.utils.stream.clock import (
+    get_played,
+    pause_clock,
+    resume_clock,
+    seek_clock,
+    start_clock,
+    stop_clock,
+)
+from AviaxMusic.utils.stream.prefetch import cancel_prefetch, prefetch
+from AviaxMusic.utils.stream.progress import progress, track_player
+from AviaxMusic.utils.stream.progressive import relay_source, wait_complete
+from AviaxMusic.utils.stream.queue import ChatQueue
 from AviaxMusic.utils.thumbnails import gen_thumb
 from strings import get_string
 
@@ -36,7 +49,10 @@ autoend = {}
 counter = {}
 
 async def _clear_(chat_id: int):
-    db[chat_id] = []
+    db[chat_id] = ChatQueue()
+    cancel_prefetch(chat_id)
+    stop_clock(chat_id)
+    progress.untrack(chat_id)
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
 
@@ -91,7 +107,7 @@ class Call(PyTgCalls):
         ffmpeg: str | None = None,
     ) -> types.MediaStream:
         return types.MediaStream(
-            media_path=source,
+            media_path=relay_source(source),
             audio_parameters=types.AudioQuality.HIGH,
             video_parameters=types.VideoQuality.HD_720p,
             audio_flags=types.MediaStream.Flags.REQUIRED,
@@ -127,10 +143,12 @@ class Call(PyTgCalls):
     async def pause_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.pause(chat_id)
+        pause_clock(chat_id)
 
     async def resume_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         await assistant.resume(chat_id)
+        resume_clock(chat_id)
 
     async def stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
@@ -168,6 +186,7 @@ class Call(PyTgCalls):
                 os.makedirs(chatdir)
             out = os.path.join(chatdir, base)
             if not os.path.isfile(out):
+                await wait_complete(file_path)
                 if str(speed) == "0.5":
                     vs = 2.0
                 elif str(speed) == "0.75":
@@ -197,31 +216,24 @@ class Call(PyTgCalls):
             out = file_path
         dur = await asyncio.get_event_loop().run_in_executor(None, check_duration, out)
         dur = int(dur)
-        played, con_seconds = speed_converter(playing[0]["played"], speed)
+        played, con_seconds = speed_converter(get_played(chat_id), speed)
         duration = seconds_to_min(dur)
         xx = f"-ss {played} -to {duration}"
-        video_mode = playing[0]["streamtype"] == "video"
+        video_mode = playing[0].streamtype == "video"
         stream = self._build_stream(out, video=video_mode, ffmpeg=xx)
-        if str(db[chat_id][0]["file"]) == str(file_path):
+        if str(db[chat_id][0].file) == str(file_path):
             await self._play_on_assistant(assistant, chat_id, stream)
         else:
             raise AssistantErr("Umm")
-        if str(db[chat_id][0]["file"]) == str(file_path):
-            exis = (playing[0]).get("old_dur")
-            if not exis:
-                db[chat_id][0]["old_dur"] = db[chat_id][0]["dur"]
-                db[chat_id][0]["old_second"] = db[chat_id][0]["seconds"]
-            db[chat_id][0]["played"] = con_seconds
-            db[chat_id][0]["dur"] = duration
-            db[chat_id][0]["seconds"] = dur
-            db[chat_id][0]["speed_path"] = out
-            db[chat_id][0]["speed"] = speed
+        if str(db[chat_id][0].file) == str(file_path):
+            seek_clock(chat_id, con_seconds)
+            db[chat_id][0].set_speed(speed, out, duration, dur)
 
     async def force_stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         try:
             check = db.get(chat_id)
-            check.pop(0)
+            check.popleft()
         except Exception:
             pass
         await remove_active_video_chat(chat_id)
@@ -270,11 +282,14 @@ class Call(PyTgCalls):
         link,
         video: Union[bool, str] = None,
         image: Union[bool, str] = None,
+        seek: int = 0,
     ):
         assistant = await group_assistant(self, chat_id)
         language = await get_lang(chat_id)
         _ = get_string(language)
-        stream = self._build_stream(link, video=bool(video))
+        stream = self._build_stream(
+            link, video=bool(video), ffmpeg=f"-ss {seek}" if seek else None
+        )
         try:
             await self._play_on_assistant(assistant, chat_id, stream)
         except exceptions.NoActiveGroupCall:
@@ -285,6 +300,7 @@ class Call(PyTgCalls):
             raise AssistantErr(_["call_10"])
         except Exception:
             raise AssistantErr(_["call_10"])
+        start_clock(chat_id, seek)
         await add_active_chat(chat_id)
         await music_on(chat_id)
         if video:
@@ -301,7 +317,7 @@ class Call(PyTgCalls):
         loop = await get_loop(chat_id)
         try:
             if loop == 0:
-                popped = check.pop(0)
+                popped = check.popleft()
             else:
                 loop = loop - 1
                 await set_loop(chat_id, loop)
@@ -315,21 +331,17 @@ class Call(PyTgCalls):
                 return await client.leave_call(chat_id, close=False)
             except Exception:
                 return
-        queued = check[0]["file"]
+        prefetch(chat_id)
+        queued = check[0].file
         language = await get_lang(chat_id)
         _ = get_string(language)
-        title = (check[0]["title"]).title()
-        user = check[0]["by"]
-        original_chat_id = check[0]["chat_id"]
-        streamtype = check[0]["streamtype"]
-        videoid = check[0]["vidid"]
-        db[chat_id][0]["played"] = 0
-        exis = (check[0]).get("old_dur")
-        if exis:
-            db[chat_id][0]["dur"] = exis
-            db[chat_id][0]["seconds"] = check[0]["old_second"]
-            db[chat_id][0]["speed_path"] = None
-            db[chat_id][0]["speed"] = 1.0
+        title = check[0].title.title()
+        user = check[0].by
+        original_chat_id = check[0].chat_id
+        streamtype = check[0].streamtype
+        videoid = check[0].vidid
+        start_clock(chat_id)
+        check[0].reset_speed()
         video = True if str(streamtype) == "video" else False
         if "live_" in queued:
             n, link = await YouTube.video(videoid, True)
@@ -348,19 +360,20 @@ class Call(PyTgCalls):
                 )
             img = await gen_thumb(videoid)
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await send_photo(
                 chat_id=original_chat_id,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
                     title[:23],
-                    check[0]["dur"],
+                    check[0].dur,
                     user,
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].message_id = run.id
+            track_player(chat_id, run, _)
+            db[chat_id][0].markup = "tg"
         elif "vid_" in queued:
             mystic = await app.send_message(original_chat_id, _["call_7"])
             try:
@@ -385,19 +398,20 @@ class Call(PyTgCalls):
             img = await gen_thumb(videoid)
             button = stream_markup(_, chat_id)
             await mystic.delete()
-            run = await app.send_photo(
+            run = await send_photo(
                 chat_id=original_chat_id,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
                     title[:23],
-                    check[0]["dur"],
+                    check[0].dur,
                     user,
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            db[chat_id][0].message_id = run.id
+            track_player(chat_id, run, _)
+            db[chat_id][0].markup = "stream"
 
         elif "index_" in queued:
             stream = self._build_stream(videoid, video=video)
@@ -409,14 +423,15 @@ class Call(PyTgCalls):
                     text=_["call_6"],
                 )
             button = stream_markup(_, chat_id)
-            run = await app.send_photo(
+            run = await send_photo(
                 chat_id=original_chat_id,
                 photo=config.STREAM_IMG_URL,
                 caption=_["stream_2"].format(user),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].message_id = run.id
+            track_player(chat_id, run, _)
+            db[chat_id][0].markup = "tg"
         else:
             stream = self._build_stream(queued, video=video)
             try:
@@ -428,7 +443,7 @@ class Call(PyTgCalls):
                 )
             if videoid == "telegram":
                 button = stream_markup(_, chat_id)
-                run = await app.send_photo(
+                run = await send_photo(
                     chat_id=original_chat_id,
                     photo=(
                         config.TELEGRAM_AUDIO_URL
@@ -436,40 +451,43 @@ class Call(PyTgCalls):
                         else config.TELEGRAM_VIDEO_URL
                     ),
                     caption=_["stream_1"].format(
-                        config.SUPPORT_GROUP, title[:23], check[0]["dur"], user
+                        config.SUPPORT_GROUP, title[:23], check[0].dur, user
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id][0].message_id = run.id
+                track_player(chat_id, run, _)
+                db[chat_id][0].markup = "tg"
             elif videoid == "soundcloud":
                 button = stream_markup(_, chat_id)
-                run = await app.send_photo(
+                run = await send_photo(
                     chat_id=original_chat_id,
                     photo=config.SOUNCLOUD_IMG_URL,
                     caption=_["stream_1"].format(
-                        config.SUPPORT_GROUP, title[:23], check[0]["dur"], user
+                        config.SUPPORT_GROUP, title[:23], check[0].dur, user
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id][0].message_id = run.id
+                track_player(chat_id, run, _)
+                db[chat_id][0].markup = "tg"
             else:
                 img = await gen_thumb(videoid)
                 button = stream_markup(_, chat_id)
-                run = await app.send_photo(
+                run = await send_photo(
                     chat_id=original_chat_id,
                     photo=img,
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
                         title[:23],
-                        check[0]["dur"],
+                        check[0].dur,
                         user,
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                db[chat_id][0].message_id = run.id
+                track_player(chat_id, run, _)
+                db[chat_id][0].markup = "stream"
 
     async def ping(self):
         pings = []
@@ -17,4 +17,16 @@ def dirr():
     if "cache" not in os.listdir():
         os.mkdir("cache")
 
+    # Leftover part files belong to downloads cut short by a restart; a part
+    # file next to its media file marks that media as incomplete too. Part
+    # files with a resume journal are kept for the next ranged download.
+    files = os.listdir("downloads")
+    for file in files:
+        if file.endswith(".part.json") and file[:-5] not in files:
+            os.remove(os.path.join("downloads", file))
+        if file.endswith(".part") and f"{file}.json" not in files:
+            os.remove(os.path.join("downloads", file))
+            if os.path.isfile(os.path.join("downloads", file[:-5])):
+                os.remove(os.path.join("downloads", file[:-5]))
+
     LOGGER(__name__).info("Directories Updated.")
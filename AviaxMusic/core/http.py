@@ -0,0 +1,37 @@
+import aiohttp
+
+import config
+
+from ..logging import LOGGER
+
+_session = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    # One pooled session for the whole process: keep-alive connections, DNS
+    # and TLS sessions are reused across every platform request.
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=config.HTTP_POOL_LIMIT,
+            limit_per_host=config.HTTP_POOL_PER_HOST,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=None,
+                connect=config.HTTP_CONNECT_TIMEOUT,
+                sock_read=config.HTTP_READ_TIMEOUT,
+            ),
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        LOGGER(__name__).info("HTTP client session closed.")
+    _session = None
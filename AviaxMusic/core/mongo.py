@@ -1,4 +1,7 @@
+import time
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
 
 from config import MONGO_DB_URI
 
@@ -12,3 +15,69 @@ try:
 except:
     LOGGER(__name__).error("Failed to connect to your Mongo Database.")
     exit()
+
+
+# collection -> [(field, unique)] for every key the database helpers look up.
+INDEXES = {
+    "adminauth": [("chat_id", True)],
+    "assistants": [("chat_id", True)],
+    "authuser": [("chat_id", True)],
+    "autoend": [("chat_id", True)],
+    "autoleave": [("chat_id", True)],
+    "blacklistChat": [("chat_id", True)],
+    "blockedusers": [("user_id", True)],
+    "broadcast": [("name", True)],
+    "chats": [("chat_id", True)],
+    "chatsettings": [("chat_id", True), ("last_active", False)],
+    "cplaymode": [("chat_id", True)],
+    "fileids": [("key", True)],
+    "gban": [("user_id", True)],
+    "language": [("chat_id", True)],
+    "migrations": [("name", True)],
+    "onoffper": [("on_off", True)],
+    "playmode": [("chat_id", True)],
+    "playtypedb": [("chat_id", True)],
+    "queues": [("chat_id", True)],
+    "skipmode": [("chat_id", True)],
+    "sudoers": [("sudo", True)],
+    "tgusersdb": [("user_id", True)],
+    "upcount": [("chat_id", True)],
+    "ytdlpclients": [("ytdlp", True)],
+}
+SLOW_INDEX = 5
+
+
+async def ensure_indexes():
+    # create_index is a no-op for an index that already exists, so this is
+    # safe on every boot. Duplicate documents block a unique index; those
+    # collections get a plain index instead and are reported.
+    for name, keys in INDEXES.items():
+        collection = mongodb[name]
+        for field, unique in keys:
+            started = time.monotonic()
+            try:
+                await collection.create_index(field, unique=unique)
+            except DuplicateKeyError:
+                LOGGER(__name__).warning(
+                    f"Duplicate {field} values in {name}, using a non-unique index."
+                )
+                await collection.create_index(field, name=f"{field}_dup")
+            except Exception as e:
+                LOGGER(__name__).warning(f"Could not index {name}.{field}: {e}")
+                continue
+            took = time.monotonic() - started
+            if took > SLOW_INDEX:
+                LOGGER(__name__).warning(f"Indexing {name}.{field} took {took:.1f}s.")
+    missing = []
+    for name, keys in INDEXES.items():
+        for field, _ in keys:
+            try:
+                plan = await mongodb[name].find({field: 0}).explain()
+            except Exception:
+                continue
+            if "COLLSCAN" in str(plan.get("queryPlanner", {}).get("winningPlan")):
+                missing.append(f"{name}.{field}")
+    if missing:
+        LOGGER(__name__).warning(f"Lookups still scan: {', '.join(missing)}")
+    else:
+        LOGGER(__name__).info("Mongo indexes are in place.")
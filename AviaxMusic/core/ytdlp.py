@@ -0,0 +1,135 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yt_dlp
+from yt_dlp.utils import DownloadCancelled
+
+import config
+
+from ..logging import LOGGER
+
+_local = threading.local()
+
+
+def _cancel_hook(status: dict):
+    # Runs inside yt-dlp's download loop, so a cancelled job stops mid-file
+    # instead of finishing a download nobody will use.
+    cancel = getattr(_local, "cancel", None)
+    if cancel is None or not cancel.is_set():
+        return
+    if status.get("tmpfilename"):
+        try:
+            os.remove(status["tmpfilename"])
+        except OSError:
+            pass
+    raise DownloadCancelled()
+
+
+def set_cancel(cancel: threading.Event = None):
+    # Binds a cancel event to the jobs this worker thread runs next.
+    _local.cancel = cancel
+
+
+def youtube_dl(opts: dict) -> yt_dlp.YoutubeDL:
+    # Warm YoutubeDL instances, one per worker thread and option set, so
+    # extractors and cookies are initialised once instead of on every call.
+    instances = getattr(_local, "instances", None)
+    if instances is None:
+        instances = _local.instances = {}
+    key = repr(sorted(opts.items()))
+    if key not in instances:
+        instances[key] = yt_dlp.YoutubeDL(opts)
+        instances[key].add_progress_hook(_cancel_hook)
+    return instances[key]
+
+
+def extract_info(link: str, opts: dict, download: bool = False) -> dict:
+    return youtube_dl(opts).extract_info(link, download=download)
+
+
+class YtDlpPool:
+    def __init__(self, workers: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self.executor = None
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.peak_queue = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+
+    def _job(self, submitted: float, func, args):
+        started = time.monotonic()
+        with self.lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_time += started - submitted
+        ok = False
+        try:
+            result = func(*args)
+            ok = True
+            return result
+        finally:
+            with self.lock:
+                self.running -= 1
+                self.run_time += time.monotonic() - started
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    async def run(self, func, *args, timeout: float = None):
+        # Cancelling or timing out drops a job that is still queued; a job
+        # already running finishes in its thread but its result is discarded.
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="ytdlp")
+        with self.lock:
+            self.queued += 1
+            self.peak_queue = max(self.peak_queue, self.queued)
+        job = self.executor.submit(self._job, time.monotonic(), func, args)
+        job.add_done_callback(self._dequeue)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            with self.lock:
+                self.timeouts += 1
+            LOGGER(__name__).warning(
+                f"yt-dlp job {getattr(func, '__name__', func)} timed out"
+            )
+            raise
+
+    def _dequeue(self, future):
+        # A job cancelled before it started never reached _job.
+        if future.cancelled():
+            with self.lock:
+                self.queued -= 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            finished = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "running": self.running,
+                "queued": self.queued,
+                "peak_queue": self.peak_queue,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "avg_wait": round(self.wait_time / finished, 2) if finished else 0,
+                "avg_run": round(self.run_time / finished, 2) if finished else 0,
+            }
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+ytdlp = YtDlpPool(config.YTDLP_WORKERS, config.YTDLP_TIMEOUT)
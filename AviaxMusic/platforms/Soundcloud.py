@@ -1,8 +1,8 @@
 from os import path
 
-from yt_dlp import YoutubeDL
-
+from AviaxMusic.core.ytdlp import extract_info, ytdlp
 from AviaxMusic.utils.formatters import seconds_to_min
+from AviaxMusic.utils.mediacache import downloads_cache
 
 
 class SoundAPI:
@@ -22,12 +22,12 @@ class SoundAPI:
             return False
 
     async def download(self, url):
-        d = YoutubeDL(self.opts)
         try:
-            info = d.extract_info(url)
+            info = await ytdlp.run(extract_info, url, self.opts, True)
         except:
             return False
         xyz = path.join("downloads", f"{info['id']}.{info['ext']}")
+        downloads_cache.add(xyz)
         duration_min = seconds_to_min(info["duration"])
         track_details = {
             "title": info["title"],
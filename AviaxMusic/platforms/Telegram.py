@@ -7,6 +7,7 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Voice
 
 import config
 from AviaxMusic import app
+from AviaxMusic.utils.mediacache import downloads_cache
 from AviaxMusic.utils.formatters import (
     check_duration,
     convert_bytes,
@@ -96,7 +97,7 @@ class TeleAPI:
         higher = [5, 10, 20, 40, 66, 80, 99]
         checker = [5, 10, 20, 40, 66, 80, 99]
         speed_counter = {}
-        if os.path.exists(fname):
+        if downloads_cache.lookup(fname):
             return True
 
         async def down_load():
@@ -173,4 +174,5 @@ class TeleAPI:
         if not verify:
             return False
         config.lyrical.pop(mystic.id)
+        downloads_cache.add(fname)
         return True
@@ -1,202 +1,303 @@
 import os
 import re
-import json
-import yt_dlp
 import random
 import logging
 import aiohttp
 import asyncio
+import threading
+import time
+from collections import deque
 from typing import Union
 from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
 from youtubesearchpython.__future__ import VideosSearch, Playlist
-from AviaxMusic.utils.database import is_on_off
+from AviaxMusic.core.http import get_session
+from AviaxMusic.core.ytdlp import extract_info, set_cancel, youtube_dl, ytdlp
+from AviaxMusic.utils.backends import BackendScheduler
+from AviaxMusic.utils.cache import TTLCache
+from AviaxMusic.utils.database import get_ytdlp_clients, is_on_off, save_ytdlp_clients
 from AviaxMusic.utils.formatters import time_to_seconds
+from AviaxMusic.utils.mediacache import downloads_cache
+from AviaxMusic.utils.singleflight import SingleFlight
+from AviaxMusic.utils.downloader import fetch_file
+from AviaxMusic.utils.stream.progressive import wait_complete
 
+import config
 from config import API_URL, VIDEO_API_URL, API_KEY, API2_URL
 
+# Concurrent plays of the same track share one download per (video_id, kind).
+downloads = SingleFlight()
+
+# API, API2 and yt-dlp downloads are hedged against each other.
+backends = BackendScheduler()
+
+# yt-dlp player clients, ranked by recent success rate and latency.
+clients = BackendScheduler()
+clients_loaded = False
+
+# VideosSearch results keyed by video id or normalized query.
+metadata = TTLCache(
+    config.METADATA_CACHE_TTL, config.METADATA_CACHE_SIZE, name="metadata"
+)
+lookups = SingleFlight()
+
 def extract_video_id(link: str):
     match = re.search(r"(?:v=|\/)([0-9A-Za-z_-]{11})", link)
     return match.group(1) if match else None
 
 
-async def run_ytdlp_download(link, ydl_opts):
-    loop = asyncio.get_running_loop()
+# Player clients tried in order by yt-dlp: Android, TV, Web, iOS, Android Creator, Android VR, Mweb
+YTDLP_STRATEGIES = [
+    {"extractor_args": {"youtube": {"player_client": ["android", "web"]}}}, # Primary Bypass
+    {"extractor_args": {"youtube": {"player_client": ["tv"]}}},
+    {}, # Default Web
+    {"extractor_args": {"youtube": {"player_client": ["ios"]}}},
+    {"extractor_args": {"youtube": {"player_client": ["android_creator"]}}},
+    {"extractor_args": {"youtube": {"player_client": ["android_vr"]}}},
+    {"extractor_args": {"youtube": {"player_client": ["mweb"]}}},
+]
+
+YTDLP_AUDIO_OPTS = {
+    "format": "bestaudio/best",
+    "outtmpl": "downloads/%(id)s.%(ext)s",
+    "geo_bypass": True,
+    "nocheckcertificate": True,
+    "quiet": True,
+    "no_warnings": True,
+}
+
+YTDLP_VIDEO_OPTS = {
+    "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
+    "outtmpl": "downloads/%(id)s.%(ext)s",
+    "geo_bypass": True,
+    "nocheckcertificate": True,
+    "quiet": True,
+    "no_warnings": True,
+}
+
+
+def strategy_name(strategy: dict) -> str:
+    player_client = strategy.get("extractor_args", {}).get("youtube", {}).get("player_client")
+    return "+".join(player_client) if player_client else "default"
+
+
+def ranked_strategies() -> list:
+    by_name = {strategy_name(strategy): strategy for strategy in YTDLP_STRATEGIES}
+    return [by_name[backend.name] for backend in clients.ranked(by_name)]
+
+
+def run_with_strategies(link, opts_template, strategies=None, cancel=None):
+    # Helper to try multiple clients for downloading, best ranked first
+    set_cancel(cancel)
+    try:
+        return _run_strategies(link, opts_template, strategies, cancel)
+    finally:
+        set_cancel(None)
+
+
+def _run_strategies(link, opts_template, strategies, cancel):
+    for strategy in strategies or ranked_strategies():
+        if cancel is not None and cancel.is_set():
+            return None
+        client = clients.backend(strategy_name(strategy))
+        start = time.monotonic()
+        try:
+            opts = opts_template.copy()
+            opts.update(strategy) # merge strategy into opts
+            # Clean up if cookiefile is explicitly None (to disable cookies)
+            if 'cookiefile' in opts and opts['cookiefile'] is None:
+                del opts['cookiefile']
 
-    def _download():
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl = youtube_dl(opts)
             info = ydl.extract_info(link, download=True)
-            return ydl.prepare_filename(info)
+            filename = ydl.prepare_filename(info)
+            if os.path.exists(filename):
+                client.record(True, time.monotonic() - start)
+                return filename
+        except Exception as e:
+            # logging.warning(f"Download failed with strategy {strategy}: {e}")
+            if cancel is not None and cancel.is_set():
+                return None
+        client.record(False, time.monotonic() - start)
+    raise Exception("All download strategies failed.")
+
+
+async def run_ytdlp_download(link, ydl_opts):
+    def _download():
+        ydl = youtube_dl(ydl_opts)
+        info = ydl.extract_info(link, download=True)
+        return ydl.prepare_filename(info)
+
+    return await ytdlp.run(_download)
 
-    return await loop.run_in_executor(None, _download)
+
+async def download_song_api(video_id: str):
+    song_url = f"{API_URL}/song/{video_id}?api={API_KEY}"
+    session = get_session()
+    for attempt in range(10):
+        try:
+            async with session.get(song_url) as response:
+                if response.status != 200:
+                    return None
+                data = await response.json()
+        except Exception:
+            return None
+        status = data.get("status", "").lower()
+
+        if status == "done":
+            download_url = data.get("link")
+            if not download_url:
+                return None
+            file_format = data.get("format", "mp3")
+            file_extension = file_format.lower()
+            os.makedirs("downloads", exist_ok=True)
+            file_path = os.path.join("downloads", f"{video_id}.{file_extension}")
+            return await fetch_file(download_url, file_path, "api")
+        elif status == "downloading":
+            await asyncio.sleep(4)
+        else:
+            return None
+    return None
 
 
 async def download_song_api2(video_id: str):
     file_path = os.path.join("downloads", f"{video_id}.mp3")
-    if os.path.exists(file_path):
+    if downloads_cache.lookup(file_path):
         return file_path
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(
-                f"{API2_URL}/download",
-                params={"url": video_id, "type": "audio"},
-                timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                if resp.status != 200:
-                    return None
-                data = await resp.json()
-                token = data.get("download_token")
-                if not token:
-                    return None
+    session = get_session()
+    try:
+        async with session.get(
+            f"{API2_URL}/download",
+            params={"url": video_id, "type": "audio"},
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            if resp.status != 200:
+                return None
+            data = await resp.json()
+            token = data.get("download_token")
+            if not token:
+                return None
+    except Exception:
+        return None
 
-            stream_url = f"{API2_URL}/stream/{video_id}?type=audio&token={token}"
-            async with session.get(stream_url) as audio_resp:
-                if audio_resp.status == 302:
-                    redirect = audio_resp.headers.get("Location")
-                    if not redirect:
-                        return None
-                    async with session.get(redirect) as final_resp:
-                        if final_resp.status != 200:
-                            return None
-                        with open(file_path, "wb") as f:
-                            async for chunk in final_resp.content.iter_chunked(16384):
-                                f.write(chunk)
-                elif audio_resp.status == 200:
-                    with open(file_path, "wb") as f:
-                        async for chunk in audio_resp.content.iter_chunked(16384):
-                            f.write(chunk)
-                else:
-                    return None
-            return file_path
+    stream_url = f"{API2_URL}/stream/{video_id}?type=audio&token={token}"
+    return await fetch_file(stream_url, file_path, "api2")
+
+
+async def download_video_api(video_id: str):
+    video_url = f"{VIDEO_API_URL}/video/{video_id}?api={API_KEY}"
+    session = get_session()
+    for attempt in range(10):
+        try:
+            async with session.get(video_url) as response:
+                if response.status != 200:
+                    raise Exception(f"API request failed with status code {response.status}")
+                data = await response.json()
         except Exception:
             return None
+        status = data.get("status", "").lower()
+
+        if status == "done":
+            download_url = data.get("link")
+            if not download_url:
+                return None
+            break
+        elif status == "downloading":
+            await asyncio.sleep(8)
+        else:
+            return None
+    else:
+        print("⏱️ Max retries reached. Still downloading...")
+        return None
+
+    file_format = data.get("format", "mp4")
+    file_extension = file_format.lower()
+    os.makedirs("downloads", exist_ok=True)
+    file_path = os.path.join("downloads", f"{video_id}.{file_extension}")
+    return await fetch_file(download_url, file_path, "video_api")
+
+
+async def load_clients():
+    global clients_loaded
+    if clients_loaded:
+        return
+    clients_loaded = True
+    try:
+        clients.restore(await get_ytdlp_clients())
+    except Exception:
+        pass
+
+
+async def download_ytdlp(video_id: str, video: bool = False):
+    await load_clients()
+    link = f"https://www.youtube.com/watch?v={video_id}"
+    opts = YTDLP_VIDEO_OPTS if video else YTDLP_AUDIO_OPTS
+    cancel = threading.Event()
+    try:
+        file_path = await ytdlp.run(run_with_strategies, link, opts, None, cancel)
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        # The worker thread is not interrupted by the cancel; this stops it.
+        cancel.set()
+        raise
+    finally:
+        try:
+            await save_ytdlp_clients(clients.stats())
+        except Exception:
+            pass
+    downloads_cache.add(file_path)
+    return file_path
+
 
 async def download_song(link: str):
     video_id = link.split('v=')[-1].split('&')[0]
+    return await downloads.run((video_id, "audio"), _download_song, video_id)
+
+
+async def _download_song(video_id: str):
     download_folder = "downloads"
-    for ext in ["mp3", "m4a", "webm"]:
-        file_path = f"{download_folder}/{video_id}.{ext}"
-        if os.path.exists(file_path):
-            return file_path
-        
-    # Try API 1
-    song_url = f"{API_URL}/song/{video_id}?api={API_KEY}"
-    async with aiohttp.ClientSession() as session:
-        for attempt in range(10):
-            try:
-                async with session.get(song_url) as response:
-                    if response.status != 200:
-                        break
-                
-                    data = await response.json()
-                    status = data.get("status", "").lower()
-
-                    if status == "done":
-                        download_url = data.get("link")
-                        if not download_url:
-                            break
-                        
-                        file_format = data.get("format", "mp3")
-                        file_extension = file_format.lower()
-                        file_name = f"{video_id}.{file_extension}"
-                        os.makedirs(download_folder, exist_ok=True)
-                        file_path = os.path.join(download_folder, file_name)
-
-                        async with session.get(download_url) as file_response:
-                            with open(file_path, 'wb') as f:
-                                while True:
-                                    chunk = await file_response.content.read(8192)
-                                    if not chunk:
-                                        break
-                                    f.write(chunk)
-                            return file_path
-                    elif status == "downloading":
-                        await asyncio.sleep(4)
-                    else:
-                        break
-            except Exception:
-                break
-    
-    # Fallback to API 2
-    return await download_song_api2(video_id)
+    file_path = downloads_cache.lookup(
+        *(f"{download_folder}/{video_id}.{ext}" for ext in ["mp3", "m4a", "webm"])
+    )
+    if file_path:
+        return file_path
+    return await backends.run(
+        {
+            "api": lambda: download_song_api(video_id),
+            "api2": lambda: download_song_api2(video_id),
+            "ytdlp": lambda: download_ytdlp(video_id),
+        },
+        fallback=("ytdlp",),
+    )
+
 
 async def download_video(link: str):
     video_id = link.split('v=')[-1].split('&')[0]
+    return await downloads.run((video_id, "video"), _download_video, video_id)
 
-    download_folder = "downloads"
-    for ext in ["mp4", "webm", "mkv"]:
-        file_path = f"{download_folder}/{video_id}.{ext}"
-        if os.path.exists(file_path):
-            return file_path
-        
-    video_url = f"{VIDEO_API_URL}/video/{video_id}?api={API_KEY}"
-    async with aiohttp.ClientSession() as session:
-        for attempt in range(10):
-            try:
-                async with session.get(video_url) as response:
-                    if response.status != 200:
-                        raise Exception(f"API request failed with status code {response.status}")
-                
-                    data = await response.json()
-                    status = data.get("status", "").lower()
 
-                    if status == "done":
-                        download_url = data.get("link")
-                        if not download_url:
-                            raise Exception("API response did not provide a download URL.")
-                        break
-                    elif status == "downloading":
-                        await asyncio.sleep(8)
-                    else:
-                        error_msg = data.get("error") or data.get("message") or f"Unexpected status '{status}'"
-                        raise Exception(f"API error: {error_msg}")
-            except Exception as e:
-                # print(f"[FAIL] {e}")
-                return None
-        else:
-            print("⏱️ Max retries reached. Still downloading...")
-            return None
-    
-
-        try:
-            file_format = data.get("format", "mp4")
-            file_extension = file_format.lower()
-            file_name = f"{video_id}.{file_extension}"
-            download_folder = "downloads"
-            os.makedirs(download_folder, exist_ok=True)
-            file_path = os.path.join(download_folder, file_name)
-
-            async with session.get(download_url) as file_response:
-                with open(file_path, 'wb') as f:
-                    while True:
-                        chunk = await file_response.content.read(8192)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-                return file_path
-        except aiohttp.ClientError as e:
-            print(f"Network or client error occurred while downloading: {e}")
-            return None
-        except Exception as e:
-            print(f"Error occurred while downloading video: {e}")
-            return None
-    return None
+async def _download_video(video_id: str):
+    download_folder = "downloads"
+    file_path = downloads_cache.lookup(
+        *(f"{download_folder}/{video_id}.{ext}" for ext in ["mp4", "webm", "mkv"])
+    )
+    if file_path:
+        return file_path
+    return await backends.run(
+        {
+            "video_api": lambda: download_video_api(video_id),
+            "ytdlp": lambda: download_ytdlp(video_id, video=True),
+        },
+        fallback=("ytdlp",),
+    )
 
 async def check_file_size(link):
     async def get_format_info(link):
-        proc = await asyncio.create_subprocess_exec(
-            "yt-dlp",
-            "-J",
-            link,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
-        if proc.returncode != 0:
-            print(f'Error:\n{stderr.decode()}')
+        try:
+            return await ytdlp.run(extract_info, link, {"quiet": True})
+        except Exception as e:
+            print(f'Error:\n{e}')
             return None
-        return json.loads(stdout.decode())
 
     def parse_size(formats):
         total_size = 0
@@ -275,18 +376,39 @@ class YouTubeAPI:
             umm = umm.split("?si=")[0]
         return umm
 
+    async def _search(self, link: str, limit: int):
+        results = await VideosSearch(link, limit=limit).next()
+        if not results or not isinstance(results, dict):
+            return []
+        return results.get("result") or []
+
+    async def search(self, link: str, limit: int = 1) -> list:
+        vidid = extract_video_id(link) if re.search(self.regex, link) else None
+        if vidid and limit == 1:
+            key = ("id", vidid)
+        else:
+            key = ("query", " ".join(link.lower().split()), limit)
+        results = metadata.get(key)
+        if results is None:
+            results = await lookups.run(key, self._search, link, limit)
+            if results:
+                metadata.set(key, results)
+                for result in results:
+                    if result.get("id"):
+                        metadata.set(("id", result["id"]), [result])
+        return results
+
     async def details(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
         try:
-            results = VideosSearch(link, limit=1)
-            search_results = await results.next()
-            if not search_results or not isinstance(search_results, dict) or "result" not in search_results or not search_results["result"]:
+            results = await self.search(link)
+            if not results:
                 return "Unknown", "00:00", 0, config.YOUTUBE_IMG_URL, "None"
             
-            result = search_results["result"][0]
+            result = results[0]
             title = result.get("title") or "Unknown"
             duration_min = result.get("duration") or "00:00"
             thumbnails = result.get("thumbnails", [])
@@ -302,17 +424,41 @@ class YouTubeAPI:
             print(f"Error in YouTube details: {e}")
             return "Unknown", "00:00", 0, config.YOUTUBE_IMG_URL, "None"
 
+    async def details_many(self, links, videoid: Union[bool, str] = None, workers: int = None):
+        # Resolves up to `workers` links at a time and yields details in the
+        # original order, so the first track is ready before the rest resolve.
+        workers = workers or config.PLAYLIST_RESOLVE_WORKERS
+        links = iter(links)
+        pending = deque()
+        try:
+            for link in links:
+                pending.append(asyncio.create_task(self.details(link, videoid)))
+                if len(pending) >= workers:
+                    break
+            while pending:
+                task = pending.popleft()
+                try:
+                    result = await task
+                except Exception:
+                    result = None
+                for link in links:
+                    pending.append(asyncio.create_task(self.details(link, videoid)))
+                    break
+                yield result
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def title(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
         try:
-            results = VideosSearch(link, limit=1)
-            search_results = await results.next()
-            if not search_results or not isinstance(search_results, dict) or "result" not in search_results or not search_results["result"]:
+            results = await self.search(link)
+            if not results:
                 return "Unknown"
-            return search_results["result"][0].get("title") or "Unknown"
+            return results[0].get("title") or "Unknown"
         except:
             return "Unknown"
 
@@ -322,11 +468,10 @@ class YouTubeAPI:
         if "&" in link:
             link = link.split("&")[0]
         try:
-            results = VideosSearch(link, limit=1)
-            search_results = await results.next()
-            if not search_results or not isinstance(search_results, dict) or "result" not in search_results or not search_results["result"]:
+            results = await self.search(link)
+            if not results:
                 return "00:00"
-            return search_results["result"][0].get("duration") or "00:00"
+            return results[0].get("duration") or "00:00"
         except:
             return "00:00"
 
@@ -336,11 +481,10 @@ class YouTubeAPI:
         if "&" in link:
             link = link.split("&")[0]
         try:
-            results = VideosSearch(link, limit=1)
-            search_results = await results.next()
-            if not search_results or not isinstance(search_results, dict) or "result" not in search_results or not search_results["result"]:
+            results = await self.search(link)
+            if not results:
                 return config.YOUTUBE_IMG_URL
-            thumbnails = search_results["result"][0].get("thumbnails", [])
+            thumbnails = results[0].get("thumbnails", [])
             return thumbnails[0].get("url").split("?")[0] if thumbnails and isinstance(thumbnails, list) and thumbnails[0].get("url") else config.YOUTUBE_IMG_URL
         except:
             return config.YOUTUBE_IMG_URL
@@ -389,9 +533,8 @@ class YouTubeAPI:
         if "&" in link:
             link = link.split("&")[0]
         try:
-            results = VideosSearch(link, limit=1)
-            search_results = await results.next()
-            if not search_results or not isinstance(search_results, dict) or "result" not in search_results or not search_results["result"]:
+            results = await self.search(link)
+            if not results:
                  return {
                     "title": "Unknown",
                     "link": link,
@@ -400,7 +543,7 @@ class YouTubeAPI:
                     "thumb": config.YOUTUBE_IMG_URL,
                 }, "None"
 
-            result = search_results["result"][0]
+            result = results[0]
             title = result.get("title") or "Unknown"
             duration_min = result.get("duration") or "00:00"
             vidid = result.get("id") or "None"
@@ -429,37 +572,35 @@ class YouTubeAPI:
             link = link.split("&")[0]
         
         ytdl_opts = {"quiet": True}
-        ydl = yt_dlp.YoutubeDL(ytdl_opts)
-        with ydl:
-            formats_available = []
-            try:
-                r = ydl.extract_info(link, download=False)
-                for format in r.get("formats", []):
+        formats_available = []
+        try:
+            r = await ytdlp.run(extract_info, link, ytdl_opts)
+            for format in r.get("formats", []):
+                try:
+                    str(format["format"])
+                except:
+                    continue
+                if not "dash" in str(format["format"]).lower():
                     try:
-                        str(format["format"])
+                        format["format"]
+                        format.get("filesize")
+                        format["format_id"]
+                        format["ext"]
+                        format.get("format_note")
                     except:
                         continue
-                    if not "dash" in str(format["format"]).lower():
-                        try:
-                            format["format"]
-                            format.get("filesize")
-                            format["format_id"]
-                            format["ext"]
-                            format.get("format_note")
-                        except:
-                            continue
-                        formats_available.append(
-                            {
-                                "format": format["format"],
-                                "filesize": format.get("filesize"),
-                                "format_id": format["format_id"],
-                                "ext": format["ext"],
-                                "format_note": format.get("format_note"),
-                                "yturl": link,
-                            }
-                        )
-            except Exception:
-                pass
+                    formats_available.append(
+                        {
+                            "format": format["format"],
+                            "filesize": format.get("filesize"),
+                            "format_id": format["format_id"],
+                            "ext": format["ext"],
+                            "format_note": format.get("format_note"),
+                            "yturl": link,
+                        }
+                    )
+        except Exception:
+            pass
         return formats_available, link
 
     async def slider(
@@ -473,9 +614,7 @@ class YouTubeAPI:
         if "&" in link:
             link = link.split("&")[0]
         try:
-            a = VideosSearch(link, limit=10)
-            res = await a.next()
-            result = res.get("result") if res and isinstance(res, dict) else None
+            result = await self.search(link, limit=10)
             if not result or len(result) <= query_type:
                 return "Unknown", "00:00", config.YOUTUBE_IMG_URL, "None"
                 
@@ -502,68 +641,6 @@ class YouTubeAPI:
     ) -> str:
         if videoid:
             link = self.base + link
-        loop = asyncio.get_running_loop()
-
-
-        # Helper to try multiple clients for downloading
-        def run_with_strategies(opts_template, strategies):
-            for strategy in strategies:
-                try:
-                    opts = opts_template.copy()
-                    opts.update(strategy) # merge strategy into opts
-                    # Clean up if cookiefile is explicitly None (to disable cookies)
-                    if 'cookiefile' in opts and opts['cookiefile'] is None:
-                        del opts['cookiefile']
-
-                    with yt_dlp.YoutubeDL(opts) as ydl:
-                        info = ydl.extract_info(link, download=True)
-                        filename = ydl.prepare_filename(info)
-                        if os.path.exists(filename):
-                            return filename
-                except Exception as e:
-                    # logging.warning(f"Download failed with strategy {strategy}: {e}")
-                    continue
-            raise Exception("All download strategies failed.")
-
-        # Define strategies: Android, TV, Web, iOS, Android Creator, Android VR, Mweb (No Cookies)
-        strategies = [
-            {"extractor_args": {"youtube": {"player_client": ["android", "web"]}}}, # Primary Bypass
-            {"extractor_args": {"youtube": {"player_client": ["tv"]}}},
-            {}, # Default Web
-            {"extractor_args": {"youtube": {"player_client": ["ios"]}}},
-            {"extractor_args": {"youtube": {"player_client": ["android_creator"]}}},
-            {"extractor_args": {"youtube": {"player_client": ["android_vr"]}}},
-            {"extractor_args": {"youtube": {"player_client": ["mweb"]}}},
-        ]
-
-        def audio_dl():
-            local_strategies = strategies
-
-            ydl_optssx = {
-                "format": "bestaudio/best",
-                "outtmpl": "downloads/%(id)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-            }
-            return run_with_strategies(ydl_optssx, local_strategies)
-
-
-        def video_dl():
-            local_strategies = strategies
-
-            ydl_optssx = {
-                "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
-                "outtmpl": "downloads/%(id)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-            }
-            return run_with_strategies(ydl_optssx, local_strategies)
-
-
         def song_video_dl():
             formats = f"{format_id}+140" if format_id else "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])"
             ydl_optssx = {
@@ -576,7 +653,7 @@ class YouTubeAPI:
                 "prefer_ffmpeg": True,
                 "merge_output_format": "mp4",
             }
-            return run_with_strategies(ydl_optssx, strategies)
+            return run_with_strategies(link, ydl_optssx)
 
         def song_audio_dl():
              ydl_optssx = {
@@ -595,16 +672,16 @@ class YouTubeAPI:
                     }
                 ],
             }
-             return run_with_strategies(ydl_optssx, strategies)
+             return run_with_strategies(link, ydl_optssx)
 
         if songvideo:
             fpath = await download_video(link)
-            if fpath: return fpath
+            if fpath and await wait_complete(fpath): return fpath
             raise Exception("Failed to download video file")
             
         elif songaudio:
             fpath = await download_song(link)
-            if fpath: return fpath
+            if fpath and await wait_complete(fpath): return fpath
             raise Exception("Failed to download audio file")
             
         elif video:
@@ -1,5 +1,3 @@
-import asyncio
-
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
@@ -7,8 +5,6 @@ from AviaxMusic import YouTube, app
 from AviaxMusic.core.call import Aviax
 from AviaxMusic.misc import SUDOERS, db
 from AviaxMusic.utils.database import (
-    get_active_chats,
-    get_lang,
     get_upvote_count,
     is_active_chat,
     is_music_playing,
@@ -18,9 +14,12 @@ from AviaxMusic.utils.database import (
     set_loop,
 )
 from AviaxMusic.utils.decorators.language import languageCB
-from AviaxMusic.utils.formatters import seconds_to_min
-from AviaxMusic.utils.inline import close_markup, stream_markup, stream_markup_timer
+from AviaxMusic.utils.fileids import send_photo
+from AviaxMusic.utils.inline import close_markup, stream_markup
 from AviaxMusic.utils.stream.autoclear import auto_clean
+from AviaxMusic.utils.stream.clock import start_clock
+from AviaxMusic.utils.stream.prefetch import prefetch
+from AviaxMusic.utils.stream.progress import track_player
 from AviaxMusic.utils.thumbnails import gen_thumb
 from config import (
     BANNED_USERS,
@@ -32,10 +31,8 @@ from config import (
     confirmer,
     votemode,
 )
-from strings import get_string
 import config
 
-checker = {}
 upvoters = {}
 
 
@@ -87,9 +84,9 @@ async def del_back_playlist(client, CallbackQuery, _):
             except:
                 return await CallbackQuery.edit_message_text(f"ғᴀɪʟᴇᴅ.")
             try:
-                if current["vidid"] != exists["vidid"]:
+                if current.vidid != exists["vidid"]:
                     return await CallbackQuery.edit_message.text(_["admin_35"])
-                if current["file"] != exists["file"]:
+                if current.file != exists["file"]:
                     return await CallbackQuery.edit_message.text(_["admin_35"])
             except:
                 return await CallbackQuery.edit_message_text(_["admin_36"])
@@ -163,7 +160,7 @@ async def del_back_playlist(client, CallbackQuery, _):
             txt = f"➻ sᴛʀᴇᴀᴍ sᴋɪᴩᴩᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
             popped = None
             try:
-                popped = check.pop(0)
+                popped = check.popleft()
                 if popped:
                     await auto_clean(popped)
                 if not check:
@@ -197,20 +194,16 @@ async def del_back_playlist(client, CallbackQuery, _):
         else:
             txt = f"➻ sᴛʀᴇᴀᴍ ʀᴇ-ᴘʟᴀʏᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
         await CallbackQuery.answer()
-        queued = check[0]["file"]
-        title = (check[0]["title"]).title()
-        user = check[0]["by"]
-        duration = check[0]["dur"]
-        streamtype = check[0]["streamtype"]
-        videoid = check[0]["vidid"]
+        prefetch(chat_id)
+        queued = check[0].file
+        title = check[0].title.title()
+        user = check[0].by
+        duration = check[0].dur
+        streamtype = check[0].streamtype
+        videoid = check[0].vidid
         status = True if str(streamtype) == "video" else None
-        db[chat_id][0]["played"] = 0
-        exis = (check[0]).get("old_dur")
-        if exis:
-            db[chat_id][0]["dur"] = exis
-            db[chat_id][0]["seconds"] = check[0]["old_second"]
-            db[chat_id][0]["speed_path"] = None
-            db[chat_id][0]["speed"] = 1.0
+        start_clock(chat_id)
+        check[0].reset_speed()
         if "live_" in queued:
             n, link = await YouTube.video(videoid, True)
             if n == 0:
@@ -228,7 +221,9 @@ async def del_back_playlist(client, CallbackQuery, _):
                 return await CallbackQuery.message.reply_text(_["call_6"])
             button = stream_markup(_, chat_id)
             img = await gen_thumb(videoid)
-            run = await CallbackQuery.message.reply_photo(
+            run = await send_photo(
+                CallbackQuery.message.chat.id,
+                reply_to_message_id=CallbackQuery.message.id,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
@@ -238,8 +233,9 @@ async def del_back_playlist(client, CallbackQuery, _):
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].message_id = run.id
+            track_player(chat_id, run, _)
+            db[chat_id][0].markup = "tg"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
         elif "vid_" in queued:
             mystic = await CallbackQuery.message.reply_text(
@@ -264,7 +260,9 @@ async def del_back_playlist(client, CallbackQuery, _):
                 return await mystic.edit_text(_["call_6"])
             button = stream_markup(_, chat_id)
             img = await gen_thumb(videoid)
-            run = await CallbackQuery.message.reply_photo(
+            run = await send_photo(
+                CallbackQuery.message.chat.id,
+                reply_to_message_id=CallbackQuery.message.id,
                 photo=img,
                 caption=_["stream_1"].format(
                     f"https://t.me/{app.username}?start=info_{videoid}",
@@ -274,8 +272,9 @@ async def del_back_playlist(client, CallbackQuery, _):
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            db[chat_id][0].message_id = run.id
+            track_player(chat_id, run, _)
+            db[chat_id][0].markup = "stream"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
             await mystic.delete()
         elif "index_" in queued:
@@ -284,13 +283,16 @@ async def del_back_playlist(client, CallbackQuery, _):
             except:
                 return await CallbackQuery.message.reply_text(_["call_6"])
             button = stream_markup(_, chat_id)
-            run = await CallbackQuery.message.reply_photo(
+            run = await send_photo(
+                CallbackQuery.message.chat.id,
+                reply_to_message_id=CallbackQuery.message.id,
                 photo=STREAM_IMG_URL,
                 caption=_["stream_2"].format(user),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].message_id = run.id
+            track_player(chat_id, run, _)
+            db[chat_id][0].markup = "tg"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
         else:
             if videoid == "telegram":
@@ -308,7 +310,9 @@ async def del_back_playlist(client, CallbackQuery, _):
                 return await CallbackQuery.message.reply_text(_["call_6"])
             if videoid == "telegram":
                 button = stream_markup(_, chat_id)
-                run = await CallbackQuery.message.reply_photo(
+                run = await send_photo(
+                    CallbackQuery.message.chat.id,
+                    reply_to_message_id=CallbackQuery.message.id,
                     photo=TELEGRAM_AUDIO_URL
                     if str(streamtype) == "audio"
                     else TELEGRAM_VIDEO_URL,
@@ -317,11 +321,14 @@ async def del_back_playlist(client, CallbackQuery, _):
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id][0].message_id = run.id
+                track_player(chat_id, run, _)
+                db[chat_id][0].markup = "tg"
             elif videoid == "soundcloud":
                 button = stream_markup(_, chat_id)
-                run = await CallbackQuery.message.reply_photo(
+                run = await send_photo(
+                    CallbackQuery.message.chat.id,
+                    reply_to_message_id=CallbackQuery.message.id,
                     photo=SOUNCLOUD_IMG_URL
                     if str(streamtype) == "audio"
                     else TELEGRAM_VIDEO_URL,
@@ -330,12 +337,15 @@ async def del_back_playlist(client, CallbackQuery, _):
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id][0].message_id = run.id
+                track_player(chat_id, run, _)
+                db[chat_id][0].markup = "tg"
             else:
                 button = stream_markup(_, chat_id)
                 img = await gen_thumb(videoid)
-                run = await CallbackQuery.message.reply_photo(
+                run = await send_photo(
+                    CallbackQuery.message.chat.id,
+                    reply_to_message_id=CallbackQuery.message.id,
                     photo=img,
                     caption=_["stream_1"].format(
                         f"https://t.me/{app.username}?start=info_{videoid}",
@@ -345,53 +355,8 @@ async def del_back_playlist(client, CallbackQuery, _):
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                db[chat_id][0].message_id = run.id
+                track_player(chat_id, run, _)
+                db[chat_id][0].markup = "stream"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
 
-
-async def markup_timer():
-    while not await asyncio.sleep(7):
-        active_chats = await get_active_chats()
-        for chat_id in active_chats:
-            try:
-                if not await is_music_playing(chat_id):
-                    continue
-                playing = db.get(chat_id)
-                if not playing:
-                    continue
-                duration_seconds = int(playing[0]["seconds"])
-                if duration_seconds == 0:
-                    continue
-                try:
-                    mystic = playing[0]["mystic"]
-                except:
-                    continue
-                try:
-                    check = checker[chat_id][mystic.id]
-                    if check is False:
-                        continue
-                except:
-                    pass
-                try:
-                    language = await get_lang(chat_id)
-                    _ = get_string(language)
-                except:
-                    _ = get_string("en")
-                try:
-                    buttons = stream_markup_timer(
-                        _,
-                        chat_id,
-                        seconds_to_min(playing[0]["played"]),
-                        playing[0]["dur"],
-                    )
-                    await mystic.edit_reply_markup(
-                        reply_markup=InlineKeyboardMarkup(buttons)
-                    )
-                except:
-                    continue
-            except:
-                continue
-
-
-asyncio.create_task(markup_timer())
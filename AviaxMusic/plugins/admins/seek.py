@@ -6,6 +6,7 @@ from AviaxMusic.core.call import Aviax
 from AviaxMusic.misc import db
 from AviaxMusic.utils import AdminRightsCheck, seconds_to_min
 from AviaxMusic.utils.inline import close_markup
+from AviaxMusic.utils.stream.clock import get_played, seek_clock
 from config import BANNED_USERS
 
 
@@ -25,12 +26,12 @@ async def seek_comm(cli, message: Message, _, chat_id):
     playing = db.get(chat_id)
     if not playing:
         return await message.reply_text(_["queue_2"])
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing[0].seconds)
     if duration_seconds == 0:
         return await message.reply_text(_["admin_22"])
-    file_path = playing[0]["file"]
-    duration_played = int(playing[0]["played"])
-    duration_total_str = playing[0]["dur"]
+    file_path = playing[0].file
+    duration_played = get_played(chat_id)
+    duration_total_str = playing[0].dur
     is_seek_back = message.command[0][-2] == "c"
     if is_seek_back:
         seek_target = duration_played - duration_to_skip
@@ -51,28 +52,25 @@ async def seek_comm(cli, message: Message, _, chat_id):
         to_seek = seek_target + 1
     mystic = await message.reply_text(_["admin_24"])
     if "vid_" in file_path:
-        n, file_path = await YouTube.video(playing[0]["vidid"], True)
+        n, file_path = await YouTube.video(playing[0].vidid, True)
         if n == 0:
             return await message.reply_text(_["admin_22"])
-    check_speed = (playing[0]).get("speed_path")
+    check_speed = playing[0].speed_path
     if check_speed:
         file_path = check_speed
     if "index_" in file_path:
-        file_path = playing[0]["vidid"]
+        file_path = playing[0].vidid
     try:
         await Aviax.seek_stream(
             chat_id,
             file_path,
             seconds_to_min(to_seek),
             duration_total_str,
-            playing[0]["streamtype"],
+            playing[0].streamtype,
         )
     except Exception:
         return await mystic.edit_text(_["admin_26"], reply_markup=close_markup(_))
-    if is_seek_back:
-        db[chat_id][0]["played"] -= duration_to_skip
-    else:
-        db[chat_id][0]["played"] += duration_to_skip
+    seek_clock(chat_id, seek_target)
     await mystic.edit_text(
         text=_["admin_25"].format(seconds_to_min(to_seek), message.from_user.mention),
         reply_markup=close_markup(_),
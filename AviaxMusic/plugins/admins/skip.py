@@ -7,8 +7,12 @@ from AviaxMusic.core.call import Aviax
 from AviaxMusic.misc import db
 from AviaxMusic.utils.database import get_loop
 from AviaxMusic.utils.decorators import AdminRightsCheck
+from AviaxMusic.utils.fileids import send_photo
 from AviaxMusic.utils.inline import close_markup, stream_markup
 from AviaxMusic.utils.stream.autoclear import auto_clean
+from AviaxMusic.utils.stream.clock import start_clock
+from AviaxMusic.utils.stream.prefetch import prefetch
+from AviaxMusic.utils.stream.progress import track_player
 from AviaxMusic.utils.thumbnails import gen_thumb
 from config import BANNED_USERS
 
@@ -35,7 +39,7 @@ async def skip(cli, message: Message, _, chat_id):
             if 1 <= skip_count <= skippable_tracks:
                 for count in range(skip_count):
                     if not check: break
-                    popped = check.pop(0)
+                    popped = check.popleft()
                     if popped:
                         await auto_clean(popped)
                 if not check:
@@ -54,7 +58,7 @@ async def skip(cli, message: Message, _, chat_id):
         else:
             return await message.reply_text(_["admin_10"])
     else:
-        popped = check.pop(0)
+        popped = check.popleft()
         if popped:
             await auto_clean(popped)
         if not check:
@@ -68,18 +72,15 @@ async def skip(cli, message: Message, _, chat_id):
                 return await Aviax.stop_stream(chat_id)
             except:
                 return
-    queued = check[0]["file"]
-    title = (check[0]["title"]).title()
-    user = check[0]["by"]
-    streamtype = check[0]["streamtype"]
-    videoid = check[0]["vidid"]
+    prefetch(chat_id)
+    queued = check[0].file
+    title = check[0].title.title()
+    user = check[0].by
+    streamtype = check[0].streamtype
+    videoid = check[0].vidid
     status = True if str(streamtype) == "video" else None
-    db[chat_id][0]["played"] = 0
-    if "old_dur" in check[0]:
-        db[chat_id][0]["dur"] = check[0]["old_dur"]
-        db[chat_id][0]["seconds"] = check[0]["old_second"]
-        db[chat_id][0]["speed_path"] = None
-        db[chat_id][0]["speed"] = 1.0
+    start_clock(chat_id)
+    check[0].reset_speed()
     try:
         if "live_" in queued:
             n, link = await YouTube.video(videoid, True)
@@ -93,7 +94,7 @@ async def skip(cli, message: Message, _, chat_id):
                 await Aviax.skip_stream(chat_id, link, video=status, image=image)
             except:
                 return await message.reply_text(_["call_6"])
-            await send_now_playing(message, videoid, title, check[0]["dur"], user, _, chat_id, "tg")
+            await send_now_playing(message, videoid, title, check[0].dur, user, _, chat_id, "tg")
 
         elif "vid_" in queued:
             mystic = await message.reply_text(_["call_7"], disable_web_page_preview=True)
@@ -112,7 +113,7 @@ async def skip(cli, message: Message, _, chat_id):
             except:
                 return await mystic.edit_text(_["call_6"])
             await mystic.delete()
-            await send_now_playing(message, videoid, title, check[0]["dur"], user, _, chat_id, "stream")
+            await send_now_playing(message, videoid, title, check[0].dur, user, _, chat_id, "stream")
 
         elif "index_" in queued:
             try:
@@ -120,13 +121,16 @@ async def skip(cli, message: Message, _, chat_id):
             except:
                 return await message.reply_text(_["call_6"])
             button = stream_markup(_, chat_id)
-            run = await message.reply_photo(
+            run = await send_photo(
+                message.chat.id,
+                reply_to_message_id=message.id,
                 photo=config.STREAM_IMG_URL,
                 caption=_["stream_2"].format(user),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].message_id = run.id
+            track_player(chat_id, run, _)
+            db[chat_id][0].markup = "tg"
 
         else:
             if videoid == "telegram":
@@ -144,18 +148,20 @@ async def skip(cli, message: Message, _, chat_id):
                 return await message.reply_text(_["call_6"])
             
             if videoid == "telegram":
-                await send_custom_ui(message, config.TELEGRAM_AUDIO_URL, config.TELEGRAM_VIDEO_URL, streamtype, config.SUPPORT_GROUP, title, check[0]["dur"], user, _, chat_id)
+                await send_custom_ui(message, config.TELEGRAM_AUDIO_URL, config.TELEGRAM_VIDEO_URL, streamtype, config.SUPPORT_GROUP, title, check[0].dur, user, _, chat_id)
             elif videoid == "soundcloud":
-                await send_custom_ui(message, config.SOUNCLOUD_IMG_URL, config.TELEGRAM_VIDEO_URL, streamtype, config.SUPPORT_GROUP, title, check[0]["dur"], user, _, chat_id)
+                await send_custom_ui(message, config.SOUNCLOUD_IMG_URL, config.TELEGRAM_VIDEO_URL, streamtype, config.SUPPORT_GROUP, title, check[0].dur, user, _, chat_id)
             else:
-                await send_now_playing(message, videoid, title, check[0]["dur"], user, _, chat_id, "stream")
+                await send_now_playing(message, videoid, title, check[0].dur, user, _, chat_id, "stream")
     except Exception:
         return await message.reply_text(_["call_6"])
 
 async def send_now_playing(message, videoid, title, duration, user, _, chat_id, markup_type):
     button = stream_markup(_, chat_id)
     img = await gen_thumb(videoid)
-    run = await message.reply_photo(
+    run = await send_photo(
+        message.chat.id,
+        reply_to_message_id=message.id,
         photo=img,
         caption=_["stream_1"].format(
             f"https://t.me/{app.username}?start=info_{videoid}",
@@ -165,18 +171,22 @@ async def send_now_playing(message, videoid, title, duration, user, _, chat_id,
         ),
         reply_markup=InlineKeyboardMarkup(button),
     )
-    db[chat_id][0]["mystic"] = run
-    db[chat_id][0]["markup"] = markup_type
+    db[chat_id][0].message_id = run.id
+    track_player(chat_id, run, _)
+    db[chat_id][0].markup = markup_type
 
 async def send_custom_ui(message, audio_img, video_img, streamtype, link, title, duration, user, _, chat_id):
     button = stream_markup(_, chat_id)
     photo = audio_img if str(streamtype) == "audio" else video_img
-    run = await message.reply_photo(
+    run = await send_photo(
+        message.chat.id,
+        reply_to_message_id=message.id,
         photo=photo,
         caption=_["stream_1"].format(
             link, title[:23], duration, user
         ),
         reply_markup=InlineKeyboardMarkup(button),
     )
-    db[chat_id][0]["mystic"] = run
-    db[chat_id][0]["markup"] = "tg"
\ No newline at end of file
+    db[chat_id][0].message_id = run.id
+    track_player(chat_id, run, _)
+    db[chat_id][0].markup = "tg"
\ No newline at end of file
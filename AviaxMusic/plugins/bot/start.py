@@ -8,10 +8,9 @@ from pyrogram.types import (
     Message,
     CallbackQuery,
 )
-from py_yt import VideosSearch
 
 import config
-from AviaxMusic import app
+from AviaxMusic import YouTube, app
 from AviaxMusic.misc import _boot_
 from AviaxMusic.plugins.sudo.sudoers import sudoers_list
 from AviaxMusic.utils.database import (
@@ -74,9 +73,7 @@ async def start_pm(client, message: Message, _):
             m = await message.reply_text("🔎")
             query = name.replace("info_", "", 1)
             query = f"https://www.youtube.com/watch?v={query}"
-            results = VideosSearch(query, limit=1)
-
-            for result in (await results.next())["result"]:
+            for result in await YouTube.search(query):
                 title = result["title"]
                 duration = result["duration"]
                 views = result["viewCount"]["short"]
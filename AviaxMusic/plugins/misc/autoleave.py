@@ -74,7 +74,8 @@ async def auto_end():
                         keys_to_remove.append(chat_id)
 
                         try:
-                            await db[chat_id][0]["mystic"].delete()
+                            track = db[chat_id][0]
+                            await app.delete_messages(track.chat_id, track.message_id)
                         except Exception:
                             pass
 
@@ -12,13 +12,16 @@ from pyrogram import filters
 import config
 from AviaxMusic import app
 from AviaxMusic.misc import HAPP, SUDOERS, XCB
+from AviaxMusic.utils.broadcast import broadcaster
 from AviaxMusic.utils.database import (
+    flush_served,
     get_active_chats,
     remove_active_chat,
     remove_active_video_chat,
 )
 from AviaxMusic.utils.decorators.language import language
 from AviaxMusic.utils.pastebin import AviaxBin
+from AviaxMusic.utils.stream.journal import journal
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -76,6 +79,10 @@ async def update_(client, message, _):
         nrs = await response.edit(_final_updates_, disable_web_page_preview=True)
     os.system("git stash &> /dev/null && git pull")
 
+    # Saved before the active list is emptied, so the queues resume on boot.
+    await journal.stop()
+    await flush_served()
+    await broadcaster.stop()
     try:
         served_chats = await get_active_chats()
         for x in served_chats:
@@ -113,6 +120,9 @@ async def update_(client, message, _):
 @app.on_message(filters.command(["restart"]) & SUDOERS)
 async def restart_(_, message):
     response = await message.reply_text("ʀᴇsᴛᴀʀᴛɪɴɢ...")
+    await journal.stop()
+    await flush_served()
+    await broadcaster.stop()
     ac_chats = await get_active_chats()
     for x in ac_chats:
         try:
@@ -6,6 +6,7 @@ from AviaxMusic.misc import SUDOERS
 from AviaxMusic.utils.database import (
     get_active_chats,
     get_active_video_chats,
+    get_assistant_loads,
     remove_active_chat,
     remove_active_video_chat,
 )
@@ -15,7 +16,13 @@ from AviaxMusic.utils.database import (
 async def active_vc(_, message: Message):
     achats = len(await get_active_chats())
     vchats = len(await get_active_video_chats())
-    await message.reply_text(f"<b>» ᴀᴄᴛɪᴠᴇ ᴠᴏɪᴄᴇ ᴄʜᴀᴛs:</b>\n\nᴠᴏɪᴄᴇ: {achats}\nᴠɪᴅᴇᴏ: {vchats}")
+    loads = "".join(
+        f"\nᴀssɪsᴛᴀɴᴛ {assistant}: {load}"
+        for assistant, load in (await get_assistant_loads()).items()
+    )
+    await message.reply_text(
+        f"<b>» ᴀᴄᴛɪᴠᴇ ᴠᴏɪᴄᴇ ᴄʜᴀᴛs:</b>\n\nᴠᴏɪᴄᴇ: {achats}\nᴠɪᴅᴇᴏ: {vchats}\n{loads}"
+    )
 
 
 @app.on_message(filters.command(["activevc", "activevoice"]) & SUDOERS)
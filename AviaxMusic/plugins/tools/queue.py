@@ -1,35 +1,36 @@
 import asyncio
-import os
 
 from pyrogram import filters
-from pyrogram.errors import FloodWait
 from pyrogram.types import CallbackQuery, InputMediaPhoto, Message
 
 import config
 from AviaxMusic import app
 from AviaxMusic.misc import db
 from AviaxMusic.utils import AviaxBin, get_channeplayCB, seconds_to_min
-from AviaxMusic.utils.database import get_cmode, is_active_chat, is_music_playing
+from AviaxMusic.utils.database import get_cmode, is_active_chat
 from AviaxMusic.utils.decorators.language import language, languageCB
 from AviaxMusic.utils.inline import queue_back_markup, queue_markup
+from AviaxMusic.utils.mediacache import thumbs_cache
+from AviaxMusic.utils.stream.clock import get_played
+from AviaxMusic.utils.stream.progress import progress
+from AviaxMusic.utils.thumbnails import thumb_path
 from config import BANNED_USERS
 
-basic = {}
-
 def get_image(videoid):
-    if os.path.isfile(f"cache/{videoid}.png"):
-        return f"cache/{videoid}.png"
+    path = thumbs_cache.lookup(thumb_path(videoid))
+    if path:
+        return path
     else:
         return config.YOUTUBE_IMG_URL
 
 
 def get_duration(playing):
-    file_path = playing[0].get("file")
+    file_path = playing[0].file
     if not file_path:
         return "Unknown"       
     if "index_" in file_path or "live_" in file_path:
         return "Unknown"       
-    duration_seconds = int(playing[0]["seconds"])
+    duration_seconds = int(playing[0].seconds)
     if duration_seconds == 0:
         return "Unknown"
     else:
@@ -59,11 +60,11 @@ async def get_queue(client, message: Message, _):
     got = db.get(chat_id)
     if not got:
         return await message.reply_text(_["queue_2"])
-    file = got[0]["file"]
-    videoid = got[0]["vidid"]
-    user = got[0]["by"]
-    title = (got[0]["title"]).title()
-    stream_type = (got[0]["streamtype"]).title()
+    file = got[0].file
+    videoid = got[0].vidid
+    user = got[0].by
+    title = got[0].title.title()
+    stream_type = got[0].streamtype.title()
     DUR = get_duration(got)
     if "live_" in file:
         IMAGE = get_image(videoid)
@@ -92,41 +93,27 @@ async def get_queue(client, message: Message, _):
             DUR,
             "c" if cplay else "g",
             videoid,
-            seconds_to_min(got[0]["played"]),
-            got[0]["dur"],
+            seconds_to_min(get_played(chat_id)),
+            got[0].dur,
         )
     )
-    basic[videoid] = True
     mystic = await message.reply_photo(IMAGE, caption=cap, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)        
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    "c" if cplay else "g",
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                            except Exception:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
+        progress.track(
+            chat_id,
+            mystic,
+            videoid,
+            lambda: queue_markup(
+                _,
+                DUR,
+                "c" if cplay else "g",
+                videoid,
+                seconds_to_min(get_played(chat_id)),
+                db[chat_id][0].dur,
+            ),
+        )
+
+
 @app.on_callback_query(filters.regex("GetTimer") & ~BANNED_USERS)
 async def quite_timer(client, CallbackQuery: CallbackQuery):
     try:
@@ -151,7 +138,7 @@ async def queued_tracks(client, CallbackQuery: CallbackQuery, _):
     if len(got) == 1:
         return await CallbackQuery.answer(_["queue_5"], show_alert=True)    
     await CallbackQuery.answer()
-    basic[videoid] = False
+    progress.untrack(chat_id, CallbackQuery.message.id)
     buttons = queue_back_markup(_, what)   
     med = InputMediaPhoto(
         media="https://telegra.ph//file/6f7d35131f69951c74ee5.jpg",
@@ -163,11 +150,11 @@ async def queued_tracks(client, CallbackQuery: CallbackQuery, _):
     for x in got:
         j += 1
         if j == 1:
-            msg += f'Streaming :\n\n✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
+            msg += f'Streaming :\n\n✨ Title : {x.title}\nDuration : {x.dur}\nBy : {x.by}\n\n'
         elif j == 2:
-            msg += f'Queued :\n\n✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'
+            msg += f'Queued :\n\n✨ Title : {x.title}\nDuration : {x.dur}\nBy : {x.by}\n\n'
         else:
-            msg += f'✨ Title : {x["title"]}\nDuration : {x["dur"]}\nBy : {x["by"]}\n\n'         
+            msg += f'✨ Title : {x.title}\nDuration : {x.dur}\nBy : {x.by}\n\n'         
     if "Queued" in msg:
         if len(msg) < 700:
             await asyncio.sleep(1)
@@ -195,11 +182,11 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
     if not got:
         return await CallbackQuery.answer(_["queue_2"], show_alert=True)       
     await CallbackQuery.answer(_["set_cb_5"], show_alert=True)
-    file = got[0]["file"]
-    videoid = got[0]["vidid"]
-    user = got[0]["by"]
-    title = (got[0]["title"]).title()
-    stream_type = (got[0]["streamtype"]).title()
+    file = got[0].file
+    videoid = got[0].vidid
+    user = got[0].by
+    title = got[0].title.title()
+    stream_type = got[0].streamtype.title()
     DUR = get_duration(got)    
     if "live_" in file:
         IMAGE = get_image(videoid)
@@ -228,39 +215,23 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
             DUR,
             cplay,
             videoid,
-            seconds_to_min(got[0]["played"]),
-            got[0]["dur"],
+            seconds_to_min(get_played(chat_id)),
+            got[0].dur,
         )
     ) 
-    basic[videoid] = True
     med = InputMediaPhoto(media=IMAGE, caption=cap)
     mystic = await CallbackQuery.edit_message_media(media=med, reply_markup=upl)
     if DUR != "Unknown":
-        try:
-            while db[chat_id][0]["vidid"] == videoid:
-                await asyncio.sleep(5)             
-                if await is_active_chat(chat_id):
-                    if basic[videoid]:
-                        if await is_music_playing(chat_id):
-                            try:
-                                buttons = queue_markup(
-                                    _,
-                                    DUR,
-                                    cplay,
-                                    videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
-                                    db[chat_id][0]["dur"],
-                                )
-                                await mystic.edit_reply_markup(reply_markup=buttons)
-                            except FloodWait:
-                                pass
-                            except Exception:
-                                pass
-                        else:
-                            pass
-                    else:
-                        break
-                else:
-                    break
-        except:
-            return
\ No newline at end of file
+        progress.track(
+            chat_id,
+            mystic,
+            videoid,
+            lambda: queue_markup(
+                _,
+                DUR,
+                cplay,
+                videoid,
+                seconds_to_min(get_played(chat_id)),
+                db[chat_id][0].dur,
+            ),
+        )
@@ -11,6 +11,7 @@ from AviaxMusic.misc import db
 from AviaxMusic.utils.database import get_assistant, get_authuser_names, get_cmode
 from AviaxMusic.utils.decorators import ActualAdminCB, AdminActual, language
 from AviaxMusic.utils.formatters import alpha_to_int, get_readable_time
+from AviaxMusic.utils.stream.queue import ChatQueue
 from config import BANNED_USERS, adminlist, lyrical
 
 rel = {}
@@ -52,7 +53,7 @@ async def restartbot(client, message: Message, _):
     mystic = await message.reply_text(_["reload_4"].format(app.mention))
     await asyncio.sleep(1)
     try:
-        db[message.chat.id] = []
+        db[message.chat.id] = ChatQueue()
         await Aviax.stop_stream_force(message.chat.id)
     except:
         pass
@@ -79,7 +80,7 @@ async def restartbot(client, message: Message, _):
         except:
             pass
         try:
-            db[chat_id] = []
+            db[chat_id] = ChatQueue()
             await Aviax.stop_stream_force(chat_id)
         except:
             pass
@@ -12,16 +12,20 @@ from ntgcalls import __version__ as ntgver
 import config
 from AviaxMusic import app
 from AviaxMusic.core.userbot import assistants
+from AviaxMusic.core.ytdlp import ytdlp
 from AviaxMusic.misc import SUDOERS, mongodb
+from AviaxMusic.platforms.Youtube import clients, load_clients, ranked_strategies, strategy_name
 from AviaxMusic.plugins import ALL_MODULES
+from AviaxMusic.utils.cache import caches
 from AviaxMusic.utils.database import (
-    get_served_chats,
-    get_served_users,
+    get_served_chats_count,
+    get_served_users_count,
     get_sudoers,
     is_autoend,
     is_autoleave,
 )
 from AviaxMusic.utils.decorators.language import language, languageCB
+from AviaxMusic.utils.inline import close_markup
 from AviaxMusic.utils.inline.stats import back_stats_buttons, stats_buttons
 from config import BANNED_USERS
 
@@ -66,8 +70,8 @@ async def overall_stats(client, CallbackQuery, _):
         await CallbackQuery.edit_message_text(_["gstats_1"].format(app.mention))
     except:
         pass
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
+    served_chats = await get_served_chats_count()
+    served_users = await get_served_users_count()
     text = _["gstats_3"].format(
         app.mention,
         len(assistants),
@@ -125,8 +129,8 @@ async def bot_stats(client, CallbackQuery, _):
         collections = "0"
         objects = "0"
 
-    served_chats = len(await get_served_chats())
-    served_users = len(await get_served_users())
+    served_chats = await get_served_chats_count()
+    served_users = await get_served_users_count()
     version_info = f"{pytgver} (Ntg {ntgver})"
     text = _["gstats_5"].format(
         app.mention,
@@ -157,4 +161,44 @@ async def bot_stats(client, CallbackQuery, _):
     except MessageIdInvalid:
         await CallbackQuery.message.reply_photo(
             photo=config.STATS_IMG_URL, caption=text, reply_markup=markup
-        )
\ No newline at end of file
+        )
+
+
+@app.on_callback_query(filters.regex("bot_internals_sudo"))
+@languageCB
+async def bot_internals(client, CallbackQuery, _):
+    # Sent as its own text message: these sections grow with every backend
+    # and cache, and would push the stats photo past the caption limit.
+    if CallbackQuery.from_user.id not in SUDOERS:
+        return await answer_callback(CallbackQuery, _["gstats_4"], alert=True)
+    await answer_callback(CallbackQuery)
+    text = _["gstats_9"].format(app.mention)
+    await load_clients()
+    ranking = []
+    for strategy in ranked_strategies():
+        stats = clients.backend(strategy_name(strategy)).stats()
+        latency = f"{stats['latency']}s" if stats["latency"] is not None else "-"
+        ranking.append(
+            f"<code>{strategy_name(strategy)}</code> : {int(stats['health'] * 100)}% | {latency}"
+        )
+    text += _["gstats_6"].format("\n".join(ranking))
+    pool = ytdlp.stats()
+    text += _["gstats_7"].format(
+        pool["running"],
+        pool["workers"],
+        pool["queued"],
+        pool["peak_queue"],
+        pool["completed"],
+        pool["failed"],
+        pool["timeouts"],
+        pool["avg_wait"],
+        pool["avg_run"],
+    )
+    lines = []
+    for name, cache in caches.items():
+        stats = cache.stats()
+        lines.append(
+            f"<code>{name}</code> : {stats['hit_rate']}% | {stats['hits']} hits, {stats['misses']} misses | {stats['size']} keys"
+        )
+    text += _["gstats_8"].format("\n".join(lines))
+    await CallbackQuery.message.reply_text(text, reply_markup=close_markup(_))
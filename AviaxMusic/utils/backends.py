@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import config
+from AviaxMusic.logging import LOGGER
+
+ALPHA = 0.3
+
+
+class Backend:
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = None
+        self.health = 1.0
+        self.failures = 0
+        self.open_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.open_until
+
+    @property
+    def score(self) -> float:
+        latency = self.latency if self.latency is not None else config.HEDGE_DELAY
+        return latency / max(self.health, 0.05)
+
+    def record(self, ok: bool, elapsed: float):
+        self.health = (1 - ALPHA) * self.health + ALPHA * (1.0 if ok else 0.0)
+        if ok:
+            self.failures = 0
+            if self.latency is None:
+                self.latency = elapsed
+            else:
+                self.latency = (1 - ALPHA) * self.latency + ALPHA * elapsed
+            return
+        self.failures += 1
+        if self.failures >= config.BREAKER_THRESHOLD:
+            self.open_until = time.monotonic() + config.BREAKER_COOLDOWN
+            LOGGER(__name__).warning(
+                f"Backend {self.name} failed {self.failures} times in a row, "
+                f"skipping it for {config.BREAKER_COOLDOWN}s."
+            )
+
+    def stats(self) -> dict:
+        return {
+            "latency": round(self.latency, 2) if self.latency is not None else None,
+            "health": round(self.health, 2),
+            "failures": self.failures,
+            "open": not self.available,
+        }
+
+    def restore(self, saved: dict):
+        self.latency = saved.get("latency")
+        self.health = saved.get("health", 1.0)
+        self.failures = saved.get("failures", 0)
+
+
+class BackendScheduler:
+    def __init__(self):
+        self.backends = {}
+
+    def backend(self, name: str) -> Backend:
+        if name not in self.backends:
+            self.backends[name] = Backend(name)
+        return self.backends[name]
+
+    def ranked(self, names) -> list:
+        # Healthy, fast backends first; open circuits only as a last resort.
+        backends = [self.backend(name) for name in names]
+        return sorted(backends, key=lambda b: (not b.available, b.score))
+
+    async def _attempt(self, backend: Backend, factory):
+        start = time.monotonic()
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER(__name__).debug(f"Backend {backend.name} raised: {e}")
+            result = None
+        backend.record(bool(result), time.monotonic() - start)
+        return result
+
+    async def run(self, attempts: dict, delay: float = None, fallback: tuple = ()):
+        # Starts the best backend, hedges with the next one whenever the
+        # current attempts fail or stay silent for `delay` seconds, and
+        # returns the first non-empty result. Backends in `fallback` are
+        # never hedged into: they only start once every other attempt failed.
+        delay = config.HEDGE_DELAY if delay is None else delay
+        queue = self.ranked(name for name in attempts if name not in fallback)
+        queue += self.ranked(name for name in attempts if name in fallback)
+        pending = set()
+        try:
+            while queue or pending:
+                if queue and not (pending and queue[0].name in fallback):
+                    backend = queue.pop(0)
+                    pending.add(
+                        asyncio.create_task(
+                            self._attempt(backend, attempts[backend.name])
+                        )
+                    )
+                hedge = queue and queue[0].name not in fallback
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    result = task.result()
+                    if result:
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
+        return None
+
+    def stats(self) -> dict:
+        return {name: backend.stats() for name, backend in self.backends.items()}
+
+    def restore(self, saved: dict):
+        for name, stats in saved.items():
+            self.backend(name).restore(stats)
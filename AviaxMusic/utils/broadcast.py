@@ -0,0 +1,393 @@
+import asyncio
+import time
+from collections import deque
+
+from pyrogram.errors import FloodWait
+
+import config
+from AviaxMusic import app
+from AviaxMusic.logging import LOGGER
+from AviaxMusic.utils.database import (
+    delete_broadcast,
+    get_broadcast,
+    get_client,
+    get_lang,
+    get_served_chats_count,
+    get_served_users_count,
+    iter_served_chats,
+    iter_served_users,
+    save_broadcast,
+)
+from AviaxMusic.utils.formatters import seconds_to_min
+from strings import get_string
+
+# Sends retried after a FloodWait before the target counts as failed.
+FLOOD_RETRIES = 3
+# Userbot limits are far stricter than the bot's, so a couple is plenty.
+ASSISTANT_WORKERS = 2
+# Phase counters written on every checkpoint; dialog snapshots are written once.
+COUNTERS = ("after", "total", "sent", "failed", "pinned", "done")
+
+
+class TokenBucket:
+    # One bucket per account. A FloodWait empties and pauses the whole
+    # bucket, so every sender of that account backs off together instead
+    # of each one running into the limit on its own.
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.resume_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+        self.updated = self.resume_at
+        self.tokens = 0
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.resume_at:
+                    await asyncio.sleep(self.resume_at - now)
+                    continue
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _Checkpoint:
+    # Ids are handed out in ascending order but finish out of order; after
+    # is the last id with nothing unfinished before it.
+    def __init__(self, after):
+        self.after = after
+        self.order = deque()
+        self.finished = set()
+
+    def dispatch(self, target: int):
+        self.order.append(target)
+
+    def finish(self, target: int):
+        self.finished.add(target)
+        while self.order and self.order[0] in self.finished:
+            self.after = self.order.popleft()
+            self.finished.discard(self.after)
+
+
+async def _listed(ids: list, after):
+    for target in ids:
+        if after is None or target > after:
+            yield target
+
+
+def _phase(total=None) -> dict:
+    return {
+        "after": None,
+        "total": total,
+        "sent": 0,
+        "failed": 0,
+        "pinned": 0,
+        "done": False,
+    }
+
+
+class Broadcaster:
+    # A job is one document: what to send, where to report, and for every
+    # phase (chats, users, each assistant) the checkpoint and counters.
+    # The bot's phases run one after another; each assistant runs its own
+    # phase alongside them with its own bucket.
+    def __init__(self, rate: float, workers: int, assistant_rate: float, interval: int):
+        self.rate = rate
+        self.workers = workers
+        self.assistant_rate = assistant_rate
+        self.interval = interval
+        self.job = None
+        self.task = None
+        self.started = 0.0
+        self.processed = 0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self, job: dict):
+        from AviaxMusic.core.userbot import assistants
+
+        phases = {}
+        if "chats" in job["targets"]:
+            phases["chats"] = _phase()
+        if "users" in job["targets"]:
+            phases["users"] = _phase()
+        if "assistants" in job["targets"]:
+            for num in assistants:
+                phases[f"assistant_{num}"] = _phase()
+        self._launch(dict(job, phases=phases, created=time.time()), fresh=True)
+
+    async def resume(self):
+        # Picks up a job interrupted by a restart or crash.
+        try:
+            job = await get_broadcast()
+        except Exception as e:
+            return LOGGER(__name__).warning(f"Could not load saved broadcast: {e}")
+        if not job or "status" not in job or self.running:
+            return
+        self._launch(job)
+        try:
+            _ = get_string(await get_lang(job["status"][0]))
+            await app.send_message(job["status"][0], _["broad_12"])
+        except Exception:
+            pass
+
+    def _launch(self, job: dict, fresh: bool = False):
+        # Set before anything is awaited, so a second /broadcast sees it.
+        self.job = job
+        self.task = asyncio.create_task(self._run(fresh))
+
+    async def stop(self):
+        # Called before a restart or shutdown so the last checkpoint lands.
+        if not self.running:
+            return
+        task, self.task = self.task, None
+        task.cancel()
+        # Waits for the phases to unwind, so the checkpoint saved is final.
+        await asyncio.gather(task, return_exceptions=True)
+        await self.save()
+
+    async def save(self):
+        values = {}
+        for name, state in self.job["phases"].items():
+            for key in COUNTERS:
+                values[f"phases.{name}.{key}"] = state[key]
+        try:
+            await save_broadcast(values)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Could not save broadcast progress: {e}")
+
+    async def _run(self, fresh: bool):
+        self.started = time.monotonic()
+        self.processed = 0
+        reporter = asyncio.create_task(self._report())
+        phases = []
+        failed = False
+        try:
+            if fresh:
+                await delete_broadcast()
+                await save_broadcast(self.job)
+            phases.append(asyncio.create_task(self._bot()))
+            phases.extend(
+                asyncio.create_task(self._assistant(name))
+                for name in self.job["phases"]
+                if name.startswith("assistant_")
+            )
+            await asyncio.gather(*phases)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Left saved, so it carries on from the checkpoint on next boot.
+            LOGGER(__name__).warning(f"Broadcast stopped: {e}")
+            failed = True
+        finally:
+            # One failed phase must not leave the others sending unseen,
+            # past a checkpoint that no longer covers what they delivered.
+            reporter.cancel()
+            for task in phases:
+                task.cancel()
+            await asyncio.gather(*phases, return_exceptions=True)
+        if failed:
+            return await self.save()
+        await self._finish()
+
+    async def _bot(self):
+        bucket = TokenBucket(self.rate)
+        job = self.job
+        phases = job["phases"]
+        if "chats" not in phases and "users" not in phases:
+            return
+        source, markup = None, None
+        if job.get("source"):
+            source = await app.get_messages(*job["source"])
+            markup = source.reply_markup
+
+        async def send(chat_id: int, pin: bool) -> bool:
+            if source:
+                m = await app.copy_message(
+                    chat_id,
+                    from_chat_id=source.chat.id,
+                    message_id=source.id,
+                    reply_markup=markup,
+                )
+            else:
+                m = await app.send_message(chat_id, text=job["text"])
+            if not pin:
+                return False
+            await bucket.acquire()
+            try:
+                await m.pin(disable_notification=job["pin"] != "loud")
+                return True
+            except FloodWait as e:
+                bucket.pause(e.value)
+            except Exception:
+                pass
+            return False
+
+        if "chats" in phases:
+            state = phases["chats"]
+            if state["total"] is None:
+                state["total"] = await get_served_chats_count()
+            await self._phase(
+                "chats",
+                iter_served_chats(ordered=True, after=state["after"]),
+                lambda chat_id: send(chat_id, bool(job.get("pin"))),
+                bucket,
+                self.workers,
+            )
+        if "users" in phases:
+            state = phases["users"]
+            if state["total"] is None:
+                state["total"] = await get_served_users_count()
+            await self._phase(
+                "users",
+                iter_served_users(ordered=True, after=state["after"]),
+                lambda user_id: send(user_id, False),
+                bucket,
+                self.workers,
+            )
+
+    async def _assistant(self, name: str):
+        job = self.job
+        state = job["phases"][name]
+        if state["done"]:
+            return
+        client = await get_client(name.split("_", 1)[1])
+        if client is None:
+            state["done"] = True
+            return
+        # Dialogs reorder as messages arrive, this broadcast included, so
+        # the targets are fixed once and walked in id order like the rest.
+        if "ids" not in state:
+            state["ids"] = sorted({dialog.chat.id async for dialog in client.get_dialogs()})
+            state["total"] = len(state["ids"])
+            await save_broadcast({f"phases.{name}.ids": state["ids"]})
+
+        async def send(chat_id: int):
+            if job.get("source"):
+                await client.forward_messages(chat_id, *job["source"])
+            else:
+                await client.send_message(chat_id, text=job["text"])
+
+        await self._phase(
+            name,
+            _listed(state["ids"], state["after"]),
+            send,
+            TokenBucket(self.assistant_rate),
+            ASSISTANT_WORKERS,
+        )
+
+    async def _deliver(self, bucket: TokenBucket, send, target: int):
+        for attempt in range(FLOOD_RETRIES):
+            await bucket.acquire()
+            try:
+                return await send(target)
+            except FloodWait as e:
+                bucket.pause(e.value)
+                if attempt == FLOOD_RETRIES - 1:
+                    raise
+
+    async def _phase(self, name: str, targets, send, bucket: TokenBucket, workers: int):
+        state = self.job["phases"][name]
+        if state["done"]:
+            return
+        checkpoint = _Checkpoint(state["after"])
+        queue = asyncio.Queue(workers * 2)
+
+        async def worker():
+            while True:
+                target = await queue.get()
+                try:
+                    pinned = await self._deliver(bucket, send, target)
+                    state["sent"] += 1
+                    state["pinned"] += bool(pinned)
+                except Exception:
+                    state["failed"] += 1
+                self.processed += 1
+                checkpoint.finish(target)
+                state["after"] = checkpoint.after
+                queue.task_done()
+
+        tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+        try:
+            async for target in targets:
+                checkpoint.dispatch(target)
+                await queue.put(target)
+            await queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+        state["done"] = True
+        await self.save()
+
+    def render(self, _) -> str:
+        phases = self.job["phases"].values()
+        elapsed = max(time.monotonic() - self.started, 1)
+        rate = self.processed / elapsed
+        remaining = sum(
+            max((state["total"] or 0) - state["sent"] - state["failed"], 0)
+            for state in phases
+            if not state["done"]
+        )
+        eta = seconds_to_min(int(remaining / rate)) if rate else "-"
+        text = _["broad_10"].format(round(rate, 1), eta)
+        for name, state in self.job["phases"].items():
+            text += _["broad_9"].format(
+                name.replace("_", " "),
+                state["sent"],
+                state["total"] if state["total"] is not None else "-",
+                state["failed"],
+            )
+        return text
+
+    async def _report(self):
+        chat_id, message_id = self.job["status"]
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.save()
+            try:
+                _ = get_string(await get_lang(chat_id))
+                await app.edit_message_text(chat_id, message_id, self.render(_))
+            except Exception:
+                pass
+
+    async def _finish(self):
+        chat_id = self.job["status"][0]
+        phases = self.job["phases"]
+        try:
+            _ = get_string(await get_lang(chat_id))
+            text = ""
+            if "chats" in phases:
+                text += _["broad_3"].format(phases["chats"]["sent"], phases["chats"]["pinned"])
+            if "users" in phases:
+                text += "\n" + _["broad_4"].format(phases["users"]["sent"])
+            assistant = [name for name in phases if name.startswith("assistant_")]
+            if assistant:
+                text += "\n\n" + _["broad_6"]
+                for name in assistant:
+                    text += _["broad_7"].format(name.split("_", 1)[1], phases[name]["sent"])
+            await app.send_message(chat_id, text.strip())
+        except Exception:
+            pass
+        await delete_broadcast()
+
+
+broadcaster = Broadcaster(
+    config.BROADCAST_RATE,
+    config.BROADCAST_WORKERS,
+    config.ASSISTANT_BROADCAST_RATE,
+    config.BROADCAST_PROGRESS_INTERVAL,
+)
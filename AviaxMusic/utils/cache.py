@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+
+from AviaxMusic.utils.singleflight import SingleFlight
+
+# name -> TTLCache, for the stats panel.
+caches = {}
+
+
+class TTLCache:
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int = 1024,
+        negative_ttl: float = None,
+        name: str = None,
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        # "Not found" answers (None) are cached too, usually for less time.
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.data = OrderedDict()
+        self.loads = SingleFlight()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        if name:
+            caches[name] = self
+
+    def __contains__(self, key):
+        return self._lookup(key) is not _MISSING
+
+    def __len__(self):
+        return len(self.data)
+
+    def _lookup(self, key):
+        item = self.data.get(key)
+        if item is None:
+            return _MISSING
+        expires, value = item
+        if expires < time.monotonic():
+            self.data.pop(key, None)
+            return _MISSING
+        self.data.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl: float = None):
+        if ttl is None:
+            ttl = self.ttl if value is not None else self.negative_ttl
+        self.data[key] = (time.monotonic() + ttl, value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        # Any load still in flight read the old value, so it must not land.
+        self.version += 1
+        self._store(key, value, ttl)
+
+    async def load(self, key, loader, *args):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        version = self.version
+        value = await self.loads.run(key, loader, *args)
+        if self.version == version:
+            self._store(key, value)
+        return value
+
+    def pop(self, key):
+        self.version += 1
+        self.data.pop(key, None)
+
+    invalidate = pop
+
+    def clear(self):
+        self.version += 1
+        self.data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits * 100 / lookups, 1) if lookups else 0,
+        }
+
+
+_MISSING = object()
@@ -1,10 +1,16 @@
 import random
 import asyncio
+import time
 from datetime import date
 from typing import Dict, List, Union
 
+from pymongo import ReplaceOne, UpdateOne
+
+import config
 from AviaxMusic import userbot
 from AviaxMusic.core.mongo import mongodb
+from AviaxMusic.logging import LOGGER
+from AviaxMusic.utils.cache import TTLCache
 
 authdb = mongodb.adminauth
 authuserdb = mongodb.authuser
@@ -13,35 +19,268 @@ autoleavedb = mongodb.autoleave
 assdb = mongodb.assistants
 blacklist_chatdb = mongodb.blacklistChat
 blockeddb = mongodb.blockedusers
+broadcastdb = mongodb.broadcast
 chatsdb = mongodb.chats
 chatdb = mongodb.chat
+chatsettingsdb = mongodb.chatsettings
 channeldb = mongodb.cplaymode
 countdb = mongodb.upcount
+fileiddb = mongodb.fileids
 gbansdb = mongodb.gban
 langdb = mongodb.language
+migrationsdb = mongodb.migrations
 onoffdb = mongodb.onoffper
 playmodedb = mongodb.playmode
 playtypedb = mongodb.playtypedb
+queuesdb = mongodb.queues
 skipdb = mongodb.skipmode
 sudoersdb = mongodb.sudoers
 usersdb = mongodb.tgusersdb
+ytdlpdb = mongodb.ytdlpclients
+
+
+class ActiveCallRegistry:
+    # Active voice chats indexed by chat, assistant and media type, so the
+    # membership checks hit on every command and the load balancer never
+    # scan a list.
+    def __init__(self):
+        self.calls = {}
+        self.video = set()
+        self.by_assistant = {}
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self.calls
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def add(self, chat_id: int, assistant: int = None):
+        call = self.calls.get(chat_id)
+        if call is None:
+            self.calls[chat_id] = {"assistant": assistant, "started": time.time()}
+        elif call["assistant"] != assistant:
+            self._unindex(chat_id, call["assistant"])
+            call["assistant"] = assistant
+        if assistant is not None:
+            self.by_assistant.setdefault(assistant, set()).add(chat_id)
+
+    def remove(self, chat_id: int):
+        call = self.calls.pop(chat_id, None)
+        self.video.discard(chat_id)
+        if call is not None:
+            self._unindex(chat_id, call["assistant"])
+
+    def _unindex(self, chat_id: int, assistant: int):
+        chats = self.by_assistant.get(assistant)
+        if chats is not None:
+            chats.discard(chat_id)
+            if not chats:
+                self.by_assistant.pop(assistant, None)
+
+    def set_video(self, chat_id: int, video: bool):
+        if video:
+            self.video.add(chat_id)
+        else:
+            self.video.discard(chat_id)
+
+    def started(self, chat_id: int) -> float:
+        call = self.calls.get(chat_id)
+        return call["started"] if call else None
+
+    def assistant_of(self, chat_id: int) -> int:
+        call = self.calls.get(chat_id)
+        return call["assistant"] if call else None
+
+    def load(self, assistant: int) -> int:
+        return len(self.by_assistant.get(assistant, ()))
+
+    def least_loaded(self, assistants: list) -> int:
+        fewest = min(self.load(assistant) for assistant in assistants)
+        return random.choice(
+            [assistant for assistant in assistants if self.load(assistant) == fewest]
+        )
+
+
+active_calls = ActiveCallRegistry()
+
+
+
+def _cache(name: str) -> TTLCache:
+    return TTLCache(
+        config.SETTINGS_CACHE_TTL,
+        config.SETTINGS_CACHE_SIZE,
+        negative_ttl=config.SETTINGS_NEGATIVE_TTL,
+        name=name,
+    )
+
 
 # Shifting to memory [mongo sucks often]
-active = []
-activevideo = []
 assistantdict = {}
-autoend = {}
-autoleave = {}
-count = {}
-channelconnect = {}
-langm = {}
+banned = _cache("banned")
+counts = TTLCache(config.COUNT_CACHE_TTL, name="counts")
+fileids = _cache("fileids")
+gbanned = _cache("gbanned")
 loop = {}
-maintenance = []
-nonadmin = {}
+onoff = _cache("onoff")
 pause = {}
-playmode = {}
-playtype = {}
-skipmode = {}
+served = _cache("served")
+settings = _cache("settings")
+
+
+async def _find_field(collection, query: dict, field: str, default=None):
+    doc = await collection.find_one(query)
+    return doc[field] if doc else default
+
+
+async def _exists(collection, query: dict) -> Union[bool, None]:
+    # None rather than False, so a miss is cached for the negative TTL only;
+    # callers coerce the result with bool().
+    return True if await collection.find_one(query) is not None else None
+
+
+async def _iter_ids(
+    collection, field: str, query: dict, batch_size: int, ordered: bool = False
+):
+    # Only the id field crosses the wire, one batch at a time.
+    cursor = collection.find(query, {"_id": 0, field: 1}, batch_size=batch_size)
+    if ordered:
+        cursor = cursor.sort(field, 1)
+    async for doc in cursor:
+        yield int(doc[field])
+
+
+async def _count(collection, query: dict) -> int:
+    return await collection.count_documents(query)
+
+
+class ServedTracker:
+    # Ids already in the served cache cost nothing. New ones are buffered
+    # and upserted together, on a timer or once the buffer is full, so a
+    # burst of /start or joins costs one bulk_write and no reads.
+    def __init__(self, collection, field: str, interval: int, batch: int):
+        self.collection = collection
+        self.field = field
+        self.interval = interval
+        self.batch = batch
+        self.pending = set()
+        self.task = None
+        self.lock = asyncio.Lock()
+
+    async def add(self, value: int):
+        if served.get(value):
+            return
+        served.set(value, True)
+        self.pending.add(value)
+        if len(self.pending) >= self.batch:
+            await self.flush()
+        elif self.task is None:
+            self.task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.interval)
+        finally:
+            self.task = None
+        await self.flush()
+
+    async def flush(self):
+        async with self.lock:
+            if not self.pending:
+                return
+            values, self.pending = self.pending, set()
+            try:
+                await self.collection.bulk_write(
+                    [
+                        UpdateOne(
+                            {self.field: value},
+                            {"$setOnInsert": {self.field: value}},
+                            upsert=True,
+                        )
+                        for value in values
+                    ],
+                    ordered=False,
+                )
+            except Exception as e:
+                # Kept for the next flush; the upserts are idempotent.
+                self.pending |= values
+                LOGGER(__name__).warning(
+                    f"Could not save {len(values)} served ids: {e}"
+                )
+
+
+# Every per-chat setting lives in one chatsettings document, so a cold chat
+# costs a single find_one no matter how many settings a command reads:
+#   lang, playmode, playtype, cmode, skipmode, upvotes, nonadmin,
+#   authusers, assistant, last_active
+async def _load_settings(chat_id: int) -> dict:
+    doc = await chatsettingsdb.find_one({"chat_id": chat_id}, {"_id": 0})
+    return doc or {}
+
+
+async def _chat_settings(chat_id: int) -> dict:
+    return await settings.load(chat_id, _load_settings, chat_id)
+
+
+async def _set_settings(chat_id: int, **values):
+    await chatsettingsdb.update_one(
+        {"chat_id": chat_id}, {"$set": values}, upsert=True
+    )
+    if chat_id in settings:
+        settings.set(chat_id, {**settings.get(chat_id), **values})
+    else:
+        settings.invalidate(chat_id)
+
+
+async def preload_chat_settings(limit: int = None):
+    # One cursor over the most recently active chats warms the cache, so
+    # the first command after a restart does not pay a round trip.
+    limit = config.SETTINGS_PRELOAD if limit is None else limit
+    if not limit:
+        return 0
+    loaded = 0
+    cursor = chatsettingsdb.find({}, {"_id": 0}).sort("last_active", -1).limit(limit)
+    async for doc in cursor:
+        settings.set(doc["chat_id"], doc)
+        loaded += 1
+    return loaded
+
+
+async def migrate_chat_settings():
+    # Folds the old one-collection-per-setting layout into chatsettings.
+    # The old collections are left untouched.
+    if await migrationsdb.find_one({"name": "chatsettings"}):
+        return
+    legacy = [
+        (langdb, lambda doc: {"lang": doc["lang"]}),
+        (playmodedb, lambda doc: {"playmode": doc["mode"]}),
+        (playtypedb, lambda doc: {"playtype": doc["mode"]}),
+        (channeldb, lambda doc: {"cmode": doc["mode"]}),
+        (skipdb, lambda doc: {"skipmode": False}),
+        (countdb, lambda doc: {"upvotes": doc["mode"]}),
+        (authdb, lambda doc: {"nonadmin": True}),
+        (authuserdb, lambda doc: {"authusers": doc["notes"]}),
+        (assdb, lambda doc: {"assistant": doc["assistant"]}),
+    ]
+    merged = {}
+    for collection, convert in legacy:
+        async for doc in collection.find({}):
+            chat_id = doc.get("chat_id")
+            if chat_id is None:
+                continue
+            try:
+                merged.setdefault(chat_id, {}).update(convert(doc))
+            except KeyError:
+                continue
+    chat_ids = list(merged)
+    for start in range(0, len(chat_ids), 1000):
+        await chatsettingsdb.bulk_write(
+            [
+                UpdateOne({"chat_id": chat_id}, {"$set": merged[chat_id]}, upsert=True)
+                for chat_id in chat_ids[start : start + 1000]
+            ],
+            ordered=False,
+        )
+    await migrationsdb.insert_one({"name": "chatsettings", "chats": len(merged)})
 
 
 async def get_assistant_number(chat_id: int) -> str:
@@ -64,23 +303,15 @@ async def get_client(assistant: int):
 
 async def set_assistant_new(chat_id, number):
     number = int(number)
-    await assdb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"assistant": number}},
-        upsert=True,
-    )
+    await _set_settings(chat_id, assistant=number)
 
 
 async def set_assistant(chat_id):
     from AviaxMusic.core.userbot import assistants
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = active_calls.least_loaded(assistants)
     assistantdict[chat_id] = ran_assistant
-    await assdb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"assistant": ran_assistant}},
-        upsert=True,
-    )
+    await _set_settings(chat_id, assistant=ran_assistant)
     userbot = await get_client(ran_assistant)
     return userbot
 
@@ -90,12 +321,11 @@ async def get_assistant(chat_id: int) -> str:
 
     assistant = assistantdict.get(chat_id)
     if not assistant:
-        dbassistant = await assdb.find_one({"chat_id": chat_id})
-        if not dbassistant:
+        got_assis = (await _chat_settings(chat_id)).get("assistant")
+        if not got_assis:
             userbot = await set_assistant(chat_id)
             return userbot
         else:
-            got_assis = dbassistant["assistant"]
             if got_assis in assistants:
                 assistantdict[chat_id] = got_assis
                 userbot = await get_client(got_assis)
@@ -115,13 +345,9 @@ async def get_assistant(chat_id: int) -> str:
 async def set_calls_assistant(chat_id):
     from AviaxMusic.core.userbot import assistants
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = active_calls.least_loaded(assistants)
     assistantdict[chat_id] = ran_assistant
-    await assdb.update_one(
-        {"chat_id": chat_id},
-        {"$set": {"assistant": ran_assistant}},
-        upsert=True,
-    )
+    await _set_settings(chat_id, assistant=ran_assistant)
     return ran_assistant
 
 
@@ -130,11 +356,10 @@ async def group_assistant(self, chat_id: int) -> int:
 
     assistant = assistantdict.get(chat_id)
     if not assistant:
-        dbassistant = await assdb.find_one({"chat_id": chat_id})
-        if not dbassistant:
+        assis = (await _chat_settings(chat_id)).get("assistant")
+        if not assis:
             assis = await set_calls_assistant(chat_id)
         else:
-            assis = dbassistant["assistant"]
             if assis in assistants:
                 assistantdict[chat_id] = assis
                 assis = assis
@@ -158,82 +383,59 @@ async def group_assistant(self, chat_id: int) -> int:
 
 
 async def is_skipmode(chat_id: int) -> bool:
-    mode = skipmode.get(chat_id)
-    if not mode:
-        user = await skipdb.find_one({"chat_id": chat_id})
-        if not user:
-            skipmode[chat_id] = True
-            return True
-        skipmode[chat_id] = False
-        return False
-    return mode
+    return (await _chat_settings(chat_id)).get("skipmode", True)
 
 
 async def skip_on(chat_id: int):
-    skipmode[chat_id] = True
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if user:
-        return await skipdb.delete_one({"chat_id": chat_id})
+    await _set_settings(chat_id, skipmode=True)
 
 
 async def skip_off(chat_id: int):
-    skipmode[chat_id] = False
-    user = await skipdb.find_one({"chat_id": chat_id})
-    if not user:
-        return await skipdb.insert_one({"chat_id": chat_id})
+    await _set_settings(chat_id, skipmode=False)
 
 
 async def get_upvote_count(chat_id: int) -> int:
-    mode = count.get(chat_id)
-    if not mode:
-        mode = await countdb.find_one({"chat_id": chat_id})
-        if not mode:
-            return 5
-        count[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await _chat_settings(chat_id)).get("upvotes", 5)
 
 
 async def set_upvotes(chat_id: int, mode: int):
-    count[chat_id] = mode
-    await countdb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await _set_settings(chat_id, upvotes=mode)
 
 
 async def is_autoend() -> bool:
-    chat_id = 1234
-    user = await autoenddb.find_one({"chat_id": chat_id})
-    if not user:
-        return False
-    return True
+    return bool(await onoff.load("autoend", _exists, autoenddb, {"chat_id": 1234}))
 
 
 async def autoend_on():
     chat_id = 1234
-    await autoenddb.insert_one({"chat_id": chat_id})
+    await autoenddb.update_one(
+        {"chat_id": chat_id}, {"$set": {"chat_id": chat_id}}, upsert=True
+    )
+    onoff.set("autoend", True)
 
 
 async def autoend_off():
     chat_id = 1234
-    await autoenddb.delete_one({"chat_id": chat_id})
+    await autoenddb.delete_many({"chat_id": chat_id})
+    onoff.set("autoend", False)
+
 
 async def is_autoleave() -> bool:
-    chat_id = 1234
-    user = await autoleavedb.find_one({"chat_id": chat_id})
-    if not user:
-        return False
-    return True
+    return bool(await onoff.load("autoleave", _exists, autoleavedb, {"chat_id": 1234}))
 
 
 async def autoleave_on():
     chat_id = 1234
-    await autoleavedb.insert_one({"chat_id": chat_id})
+    await autoleavedb.update_one(
+        {"chat_id": chat_id}, {"$set": {"chat_id": chat_id}}, upsert=True
+    )
+    onoff.set("autoleave", True)
 
 
 async def autoleave_off():
     chat_id = 1234
-    await autoleavedb.delete_one({"chat_id": chat_id})
+    await autoleavedb.delete_many({"chat_id": chat_id})
+    onoff.set("autoleave", False)
 
 
 async def get_loop(chat_id: int) -> int:
@@ -248,76 +450,35 @@ async def set_loop(chat_id: int, mode: int):
 
 
 async def get_cmode(chat_id: int) -> int:
-    mode = channelconnect.get(chat_id)
-    if not mode:
-        mode = await channeldb.find_one({"chat_id": chat_id})
-        if not mode:
-            return None
-        channelconnect[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await _chat_settings(chat_id)).get("cmode")
 
 
 async def set_cmode(chat_id: int, mode: int):
-    channelconnect[chat_id] = mode
-    await channeldb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await _set_settings(chat_id, cmode=mode)
 
 
 async def get_playtype(chat_id: int) -> str:
-    mode = playtype.get(chat_id)
-    if not mode:
-        mode = await playtypedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playtype[chat_id] = "Everyone"
-            return "Everyone"
-        playtype[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await _chat_settings(chat_id)).get("playtype", "Everyone")
 
 
 async def set_playtype(chat_id: int, mode: str):
-    playtype[chat_id] = mode
-    await playtypedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await _set_settings(chat_id, playtype=mode)
 
 
 async def get_playmode(chat_id: int) -> str:
-    mode = playmode.get(chat_id)
-    if not mode:
-        mode = await playmodedb.find_one({"chat_id": chat_id})
-        if not mode:
-            playmode[chat_id] = "Direct"
-            return "Direct"
-        playmode[chat_id] = mode["mode"]
-        return mode["mode"]
-    return mode
+    return (await _chat_settings(chat_id)).get("playmode", "Direct")
 
 
 async def set_playmode(chat_id: int, mode: str):
-    playmode[chat_id] = mode
-    await playmodedb.update_one(
-        {"chat_id": chat_id}, {"$set": {"mode": mode}}, upsert=True
-    )
+    await _set_settings(chat_id, playmode=mode)
 
 
 async def get_lang(chat_id: int) -> str:
-    mode = langm.get(chat_id)
-    if not mode:
-        lang = await langdb.find_one({"chat_id": chat_id})
-        if not lang:
-            langm[chat_id] = "en"
-            return "en"
-        langm[chat_id] = lang["lang"]
-        return lang["lang"]
-    return mode
+    return (await _chat_settings(chat_id)).get("lang", "en")
 
 
 async def set_lang(chat_id: int, lang: str):
-    langm[chat_id] = lang
-    await langdb.update_one({"chat_id": chat_id}, {"$set": {"lang": lang}}, upsert=True)
+    await _set_settings(chat_id, lang=lang)
 
 
 async def is_music_playing(chat_id: int) -> bool:
@@ -336,144 +497,94 @@ async def music_off(chat_id: int):
 
 
 async def get_active_chats() -> list:
-    return active
+    return list(active_calls.calls)
 
 
 async def is_active_chat(chat_id: int) -> bool:
-    if chat_id not in active:
-        return False
-    else:
-        return True
+    return chat_id in active_calls
 
 
 async def add_active_chat(chat_id: int):
-    if chat_id not in active:
-        active.append(chat_id)
+    if chat_id not in active_calls:
+        await _set_settings(chat_id, last_active=time.time())
+    active_calls.add(chat_id, assistantdict.get(chat_id))
 
 
 async def remove_active_chat(chat_id: int):
-    if chat_id in active:
-        active.remove(chat_id)
+    active_calls.remove(chat_id)
 
 
 async def get_active_video_chats() -> list:
-    return activevideo
+    return list(active_calls.video)
 
 
 async def is_active_video_chat(chat_id: int) -> bool:
-    if chat_id not in activevideo:
-        return False
-    else:
-        return True
+    return chat_id in active_calls.video
 
 
 async def add_active_video_chat(chat_id: int):
-    if chat_id not in activevideo:
-        activevideo.append(chat_id)
+    active_calls.set_video(chat_id, True)
 
 
 async def remove_active_video_chat(chat_id: int):
-    if chat_id in activevideo:
-        activevideo.remove(chat_id)
+    active_calls.set_video(chat_id, False)
+
+
+async def get_assistant_loads() -> dict:
+    from AviaxMusic.core.userbot import assistants
+
+    return {assistant: active_calls.load(assistant) for assistant in assistants}
 
 
 async def check_nonadmin_chat(chat_id: int) -> bool:
-    user = await authdb.find_one({"chat_id": chat_id})
-    if not user:
-        return False
-    return True
+    return await is_nonadmin_chat(chat_id)
 
 
 async def is_nonadmin_chat(chat_id: int) -> bool:
-    mode = nonadmin.get(chat_id)
-    if not mode:
-        user = await authdb.find_one({"chat_id": chat_id})
-        if not user:
-            nonadmin[chat_id] = False
-            return False
-        nonadmin[chat_id] = True
-        return True
-    return mode
+    return (await _chat_settings(chat_id)).get("nonadmin", False)
 
 
 async def add_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = True
-    is_admin = await check_nonadmin_chat(chat_id)
-    if is_admin:
-        return
-    return await authdb.insert_one({"chat_id": chat_id})
+    await _set_settings(chat_id, nonadmin=True)
 
 
 async def remove_nonadmin_chat(chat_id: int):
-    nonadmin[chat_id] = False
-    is_admin = await check_nonadmin_chat(chat_id)
-    if not is_admin:
-        return
-    return await authdb.delete_one({"chat_id": chat_id})
+    await _set_settings(chat_id, nonadmin=False)
 
 
 async def is_on_off(on_off: int) -> bool:
-    onoff = await onoffdb.find_one({"on_off": on_off})
-    if not onoff:
-        return False
-    return True
+    return bool(await onoff.load(on_off, _exists, onoffdb, {"on_off": on_off}))
 
 
 async def add_on(on_off: int):
     is_on = await is_on_off(on_off)
-    if is_on:
-        return
-    return await onoffdb.insert_one({"on_off": on_off})
+    if not is_on:
+        await onoffdb.insert_one({"on_off": on_off})
+    onoff.set(on_off, True)
 
 
 async def add_off(on_off: int):
     is_off = await is_on_off(on_off)
-    if not is_off:
-        return
-    return await onoffdb.delete_one({"on_off": on_off})
+    if is_off:
+        await onoffdb.delete_one({"on_off": on_off})
+    onoff.set(on_off, False)
 
 
 async def is_maintenance():
-    if not maintenance:
-        get = await onoffdb.find_one({"on_off": 1})
-        if not get:
-            maintenance.clear()
-            maintenance.append(2)
-            return True
-        else:
-            maintenance.clear()
-            maintenance.append(1)
-            return False
-    else:
-        if 1 in maintenance:
-            return False
-        else:
-            return True
+    # True means the bot is serving everyone, i.e. maintenance is off.
+    return not await is_on_off(1)
 
 
 async def maintenance_off():
-    maintenance.clear()
-    maintenance.append(2)
-    is_off = await is_on_off(1)
-    if not is_off:
-        return
-    return await onoffdb.delete_one({"on_off": 1})
+    await add_off(1)
 
 
 async def maintenance_on():
-    maintenance.clear()
-    maintenance.append(1)
-    is_on = await is_on_off(1)
-    if is_on:
-        return
-    return await onoffdb.insert_one({"on_off": 1})
+    await add_on(1)
 
 
 async def is_served_user(user_id: int) -> bool:
-    user = await usersdb.find_one({"user_id": user_id})
-    if not user:
-        return False
-    return True
+    return bool(await served.load(user_id, _exists, usersdb, {"user_id": user_id}))
 
 
 async def get_served_users() -> list:
@@ -483,11 +594,21 @@ async def get_served_users() -> list:
     return users_list
 
 
+def iter_served_users(
+    batch_size: int = 1000, ordered: bool = False, after: int = None
+):
+    # Ordered passes yield ascending ids, optionally only those past after,
+    # so an interrupted pass can pick up where it stopped.
+    query = {"$gt": 0 if after is None else max(after, 0)}
+    return _iter_ids(usersdb, "user_id", {"user_id": query}, batch_size, ordered)
+
+
+async def get_served_users_count() -> int:
+    return await counts.load("users", _count, usersdb, {"user_id": {"$gt": 0}})
+
+
 async def add_served_user(user_id: int):
-    is_served = await is_served_user(user_id)
-    if is_served:
-        return
-    return await usersdb.insert_one({"user_id": user_id})
+    await served_users.add(user_id)
 
 
 async def get_served_chats() -> list:
@@ -497,18 +618,38 @@ async def get_served_chats() -> list:
     return chats_list
 
 
+def iter_served_chats(
+    batch_size: int = 1000, ordered: bool = False, after: int = None
+):
+    query = {"$lt": 0}
+    if after is not None:
+        query["$gt"] = after
+    return _iter_ids(chatsdb, "chat_id", {"chat_id": query}, batch_size, ordered)
+
+
+async def get_served_chats_count() -> int:
+    return await counts.load("chats", _count, chatsdb, {"chat_id": {"$lt": 0}})
+
+
 async def is_served_chat(chat_id: int) -> bool:
-    chat = await chatsdb.find_one({"chat_id": chat_id})
-    if not chat:
-        return False
-    return True
+    return bool(await served.load(chat_id, _exists, chatsdb, {"chat_id": chat_id}))
 
 
 async def add_served_chat(chat_id: int):
-    is_served = await is_served_chat(chat_id)
-    if is_served:
-        return
-    return await chatsdb.insert_one({"chat_id": chat_id})
+    await served_chats.add(chat_id)
+
+
+async def flush_served():
+    await served_users.flush()
+    await served_chats.flush()
+
+
+served_users = ServedTracker(
+    usersdb, "user_id", config.SERVED_FLUSH_INTERVAL, config.SERVED_FLUSH_BATCH
+)
+served_chats = ServedTracker(
+    chatsdb, "chat_id", config.SERVED_FLUSH_INTERVAL, config.SERVED_FLUSH_BATCH
+)
 
 
 async def blacklisted_chats() -> list:
@@ -533,10 +674,8 @@ async def whitelist_chat(chat_id: int) -> bool:
 
 
 async def _get_authusers(chat_id: int) -> Dict[str, int]:
-    _notes = await authuserdb.find_one({"chat_id": chat_id})
-    if not _notes:
-        return {}
-    return _notes["notes"]
+    # Callers edit the returned dict before saving it, so hand out a copy.
+    return dict((await _chat_settings(chat_id)).get("authusers", {}))
 
 
 async def get_authuser_names(chat_id: int) -> List[str]:
@@ -560,9 +699,7 @@ async def save_authuser(chat_id: int, name: str, note: dict):
     _notes = await _get_authusers(chat_id)
     _notes[name] = note
 
-    await authuserdb.update_one(
-        {"chat_id": chat_id}, {"$set": {"notes": _notes}}, upsert=True
-    )
+    await _set_settings(chat_id, authusers=_notes)
 
 
 async def delete_authuser(chat_id: int, name: str) -> bool:
@@ -570,42 +707,35 @@ async def delete_authuser(chat_id: int, name: str) -> bool:
     name = name
     if name in notesd:
         del notesd[name]
-        await authuserdb.update_one(
-            {"chat_id": chat_id},
-            {"$set": {"notes": notesd}},
-            upsert=True,
-        )
+        await _set_settings(chat_id, authusers=notesd)
         return True
     return False
 
 
 async def get_gbanned() -> list:
-    results = []
-    async for user in gbansdb.find({"user_id": {"$gt": 0}}):
-        user_id = user["user_id"]
-        results.append(user_id)
-    return results
+    return [user_id async for user_id in iter_gbanned()]
+
+
+def iter_gbanned(batch_size: int = 1000):
+    return _iter_ids(gbansdb, "user_id", {"user_id": {"$gt": 0}}, batch_size)
 
 
 async def is_gbanned_user(user_id: int) -> bool:
-    user = await gbansdb.find_one({"user_id": user_id})
-    if not user:
-        return False
-    return True
+    return bool(await gbanned.load(user_id, _exists, gbansdb, {"user_id": user_id}))
 
 
 async def add_gban_user(user_id: int):
     is_gbanned = await is_gbanned_user(user_id)
-    if is_gbanned:
-        return
-    return await gbansdb.insert_one({"user_id": user_id})
+    if not is_gbanned:
+        await gbansdb.insert_one({"user_id": user_id})
+    gbanned.set(user_id, True)
 
 
 async def remove_gban_user(user_id: int):
     is_gbanned = await is_gbanned_user(user_id)
-    if not is_gbanned:
-        return
-    return await gbansdb.delete_one({"user_id": user_id})
+    if is_gbanned:
+        await gbansdb.delete_one({"user_id": user_id})
+    gbanned.set(user_id, False)
 
 
 async def get_sudoers() -> list:
@@ -634,35 +764,96 @@ async def remove_sudo(user_id: int) -> bool:
 
 
 async def get_banned_users() -> list:
-    results = []
-    async for user in blockeddb.find({"user_id": {"$gt": 0}}):
-        user_id = user["user_id"]
-        results.append(user_id)
-    return results
+    return [user_id async for user_id in iter_banned_users()]
+
+
+def iter_banned_users(batch_size: int = 1000):
+    return _iter_ids(blockeddb, "user_id", {"user_id": {"$gt": 0}}, batch_size)
 
 
 async def get_banned_count() -> int:
-    users = blockeddb.find({"user_id": {"$gt": 0}})
-    users = await users.to_list(length=100000)
-    return len(users)
+    return await counts.load("banned", _count, blockeddb, {"user_id": {"$gt": 0}})
 
 
 async def is_banned_user(user_id: int) -> bool:
-    user = await blockeddb.find_one({"user_id": user_id})
-    if not user:
-        return False
-    return True
+    return bool(await banned.load(user_id, _exists, blockeddb, {"user_id": user_id}))
 
 
 async def add_banned_user(user_id: int):
     is_gbanned = await is_banned_user(user_id)
-    if is_gbanned:
-        return
-    return await blockeddb.insert_one({"user_id": user_id})
+    if not is_gbanned:
+        await blockeddb.insert_one({"user_id": user_id})
+        counts.invalidate("banned")
+    banned.set(user_id, True)
 
 
 async def remove_banned_user(user_id: int):
     is_gbanned = await is_banned_user(user_id)
-    if not is_gbanned:
-        return
-    return await blockeddb.delete_one({"user_id": user_id})
+    if is_gbanned:
+        await blockeddb.delete_one({"user_id": user_id})
+        counts.invalidate("banned")
+    banned.set(user_id, False)
+
+
+async def get_ytdlp_clients() -> dict:
+    clients = await ytdlpdb.find_one({"ytdlp": "clients"})
+    if not clients:
+        return {}
+    return clients["clients"]
+
+
+async def save_ytdlp_clients(clients: dict):
+    await ytdlpdb.update_one(
+        {"ytdlp": "clients"}, {"$set": {"clients": clients}}, upsert=True
+    )
+
+
+async def get_saved_queues() -> list:
+    queues = []
+    async for queue in queuesdb.find({}):
+        queues.append(queue)
+    return queues
+
+
+async def save_queues(queues: list):
+    await queuesdb.bulk_write(
+        [
+            ReplaceOne({"chat_id": queue["chat_id"]}, queue, upsert=True)
+            for queue in queues
+        ],
+        ordered=False,
+    )
+
+
+async def delete_saved_queues(chat_ids: list):
+    await queuesdb.delete_many({"chat_id": {"$in": chat_ids}})
+
+
+async def get_broadcast() -> Union[dict, None]:
+    return await broadcastdb.find_one({"name": "broadcast"}, {"_id": 0})
+
+
+async def save_broadcast(values: dict):
+    await broadcastdb.update_one(
+        {"name": "broadcast"}, {"$set": values}, upsert=True
+    )
+
+
+async def delete_broadcast():
+    await broadcastdb.delete_one({"name": "broadcast"})
+
+
+async def get_file_id(key: str) -> Union[str, None]:
+    return await fileids.load(key, _find_field, fileiddb, {"key": key}, "file_id")
+
+
+async def save_file_id(key: str, file_id: str):
+    await fileiddb.update_one(
+        {"key": key}, {"$set": {"file_id": file_id}}, upsert=True
+    )
+    fileids.set(key, file_id)
+
+
+async def delete_file_id(key: str):
+    await fileiddb.delete_one({"key": key})
+    fileids.set(key, None)
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import os
+from collections import deque
+
+import config
+from AviaxMusic.core.http import get_session
+from AviaxMusic.logging import LOGGER
+from AviaxMusic.utils.mediacache import downloads_cache
+from AviaxMusic.utils.stream.progressive import Download, growing, start_relay
+
+BUFFER = 1024 * 1024
+RETRIES = 3
+
+
+class Truncated(Exception):
+    pass
+
+
+def _load_journal(journal: str, part: str, total: int) -> set:
+    # Finished segments survive a dropped connection or a cancelled hedge,
+    # as long as the part file still has the size we pre-allocated.
+    try:
+        with open(journal) as f:
+            saved = json.load(f)
+        if saved["total"] == total and os.path.getsize(part) == total:
+            return set(saved["done"])
+    except Exception:
+        pass
+    return set()
+
+
+def _save_journal(journal: str, total: int, done: set):
+    try:
+        with open(journal, "w") as f:
+            json.dump({"total": total, "done": sorted(done)}, f)
+    except Exception:
+        pass
+
+
+async def _sequential(download: Download, resp, part: str):
+    fd = os.open(part, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        async for chunk in resp.content.iter_chunked(BUFFER):
+            os.write(fd, chunk)
+            download.size += len(chunk)
+            download.notify()
+    finally:
+        os.close(fd)
+        resp.release()
+    if download.total and download.size != download.total:
+        raise Truncated(f"got {download.size} of {download.total} bytes")
+
+
+async def _ranged(download: Download, url: str, part: str):
+    total = download.total
+    step = config.RANGE_SEGMENT * 1024 * 1024
+    segments = [(start, min(start + step, total) - 1) for start in range(0, total, step)]
+    journal = f"{part}.json"
+    done = _load_journal(journal, part, total)
+    if not done:
+        with open(part, "wb") as f:
+            f.truncate(total)
+    progress = {start: (end - start + 1 if start in done else 0) for start, end in segments}
+    pending = deque(segment for segment in segments if segment[0] not in done)
+    session = get_session()
+
+    def contiguous() -> int:
+        # Bytes available from offset 0 without a hole; the relay never reads past it.
+        size = 0
+        for start, end in segments:
+            size += progress[start]
+            if progress[start] < end - start + 1:
+                break
+        return size
+
+    async def fetch(fd: int, start: int, end: int):
+        for attempt in range(RETRIES):
+            offset = start + progress[start]
+            try:
+                async with session.get(url, headers={"Range": f"bytes={offset}-{end}"}) as resp:
+                    if resp.status != 206:
+                        raise Exception(f"range request returned {resp.status}")
+                    async for chunk in resp.content.iter_chunked(BUFFER):
+                        os.pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+                        progress[start] += len(chunk)
+                        download.size = contiguous()
+                        download.notify()
+                if progress[start] != end - start + 1:
+                    raise Truncated(f"segment {start}-{end} cut short")
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if attempt == RETRIES - 1:
+                    raise
+                await asyncio.sleep(1)
+
+    async def worker(fd: int):
+        while pending:
+            start, end = pending.popleft()
+            await fetch(fd, start, end)
+            done.add(start)
+            _save_journal(journal, total, done)
+
+    download.size = contiguous()
+    fd = os.open(part, os.O_RDWR)
+    workers = [asyncio.create_task(worker(fd)) for _ in range(config.RANGE_WORKERS)]
+    try:
+        await asyncio.gather(*workers)
+        # The part file may already carry its final name, so check through the fd.
+        size = os.fstat(fd).st_size
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        os.close(fd)
+    if sum(progress.values()) != total or size != total:
+        raise Truncated(f"got {sum(progress.values())} of {total} bytes")
+    try:
+        os.remove(journal)
+    except OSError:
+        pass
+
+
+async def _run(download: Download, job):
+    try:
+        await job
+        download.done = True
+    except asyncio.CancelledError:
+        download.failed = True
+        raise
+    except Exception as e:
+        download.failed = True
+        LOGGER(__name__).warning(
+            f"Download of {os.path.basename(download.path)} failed: {e}"
+        )
+    finally:
+        download.notify()
+
+
+def _handed_over(download: Download, task):
+    growing.pop(download.path, None)
+    for leftover in (f"{download.path}.part", f"{download.part}.json"):
+        try:
+            os.remove(leftover)
+        except OSError:
+            pass
+    if download.failed:
+        downloads_cache.discard(download.path)
+        try:
+            os.remove(download.path)
+        except OSError:
+            pass
+    else:
+        downloads_cache.add(download.path)
+
+
+async def fetch_file(url: str, file_path: str, tag: str = "dl"):
+    # Each backend writes to its own part file, so hedged downloads of the
+    # same track never clobber each other or expose a half-written file.
+    # Servers that accept Range requests are fetched in parallel segments
+    # with a resume journal; the part file is only renamed into place once
+    # its size checks out. With PROGRESSIVE_PREFIX set, the part file takes
+    # the final name as soon as that many leading bytes have arrived and the
+    # tail keeps downloading behind it.
+    part = f"{file_path}.{tag}.part"
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    prefix = config.PROGRESSIVE_PREFIX * 1024
+    if prefix:
+        await start_relay()
+    resp = await get_session().get(url)
+    if resp.status != 200:
+        resp.release()
+        return None
+    # A transparently decompressed body cannot be checked against Content-Length.
+    total = None if resp.headers.get("Content-Encoding") else resp.content_length
+    download = Download(os.path.abspath(file_path), total)
+    download.part = part
+    ranged = (
+        resp.headers.get("Accept-Ranges", "").lower() == "bytes"
+        and (download.total or 0) > config.RANGE_SEGMENT * 1024 * 1024
+    )
+    if ranged:
+        resp.release()
+        job = _ranged(download, url, part)
+    else:
+        job = _sequential(download, resp, part)
+    download.task = asyncio.create_task(_run(download, job))
+    try:
+        while not download.task.done() and not (prefix and download.size >= prefix):
+            changed = download.changed
+            await changed.wait()
+    except asyncio.CancelledError:
+        download.task.cancel()
+        # A ranged part file is kept for its resume journal; a sequential one
+        # cannot be resumed, so it would only wait for the boot sweep.
+        if not ranged:
+            try:
+                os.remove(part)
+            except OSError:
+                pass
+        raise
+
+    if not download.task.done():
+        os.replace(part, file_path)
+        # Marks the file as incomplete should the bot die before the tail lands.
+        open(f"{file_path}.part", "w").close()
+        growing[download.path] = download
+        download.task.add_done_callback(lambda task: _handed_over(download, task))
+        return file_path
+
+    if download.failed:
+        if not ranged and os.path.exists(part):
+            os.remove(part)
+        return None
+    os.replace(part, file_path)
+    downloads_cache.add(file_path)
+    return file_path
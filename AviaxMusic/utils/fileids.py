@@ -0,0 +1,32 @@
+import os
+
+from pyrogram.errors import BadRequest
+
+from AviaxMusic import app
+from AviaxMusic.utils.database import delete_file_id, get_file_id, save_file_id
+
+
+def photo_key(photo) -> str:
+    # Local files are keyed by name and size so a re-rendered card gets a new
+    # upload; URLs by themselves. Anything else is already a file_id.
+    photo = str(photo)
+    if os.path.isfile(photo):
+        return f"{os.path.basename(photo)}:{os.path.getsize(photo)}"
+    if photo.startswith(("http://", "https://")):
+        return photo
+    return None
+
+
+async def send_photo(chat_id, photo, **kwargs):
+    key = photo_key(photo)
+    if key:
+        file_id = await get_file_id(key)
+        if file_id:
+            try:
+                return await app.send_photo(chat_id, file_id, **kwargs)
+            except (BadRequest, ValueError):
+                await delete_file_id(key)
+    message = await app.send_photo(chat_id, photo, **kwargs)
+    if key and message.photo:
+        await save_file_id(key, message.photo.file_id)
+    return message
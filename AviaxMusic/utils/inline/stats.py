@@ -17,6 +17,10 @@ def stats_buttons(_, status):
             text=_["SA_B_3"],
             callback_data="TopOverall",
         ),
+        InlineKeyboardButton(
+            text=_["SA_B_4"],
+            callback_data="bot_internals_sudo",
+        ),
     ]
     upl = InlineKeyboardMarkup(
         [
@@ -0,0 +1,157 @@
+import json
+import os
+import time
+
+import config
+from AviaxMusic.logging import LOGGER
+from AviaxMusic.misc import db
+from AviaxMusic.utils.stream.progressive import growing
+
+
+class MediaCache:
+    def __init__(self, directory: str, budget: int, policy: str = "lru", protected=None):
+        self.directory = os.path.abspath(directory)
+        self.index = os.path.join(self.directory, ".index.json")
+        self.budget = budget
+        self.policy = policy.lower()
+        self.protected = protected
+        self.entries = {}
+        self.loaded = False
+
+    def _load(self):
+        self.loaded = True
+        try:
+            with open(self.index) as f:
+                saved = json.load(f)
+        except Exception:
+            saved = {}
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if name.startswith(".") or name.endswith((".part", ".part.json")) or not os.path.isfile(path):
+                continue
+            if path in growing:
+                continue
+            stat = os.stat(path)
+            last, hits = saved.get(name, (max(stat.st_atime, stat.st_mtime), 0))
+            self.entries[path] = [stat.st_size, last, hits]
+
+    def _save(self):
+        data = {os.path.basename(path): entry[1:] for path, entry in self.entries.items()}
+        try:
+            with open(self.index, "w") as f:
+                json.dump(data, f)
+        except Exception:
+            pass
+
+    def _key(self, path: str) -> str:
+        return os.path.abspath(path)
+
+    def usage(self) -> int:
+        if not self.loaded:
+            self._load()
+        return sum(entry[0] for entry in self.entries.values())
+
+    def lookup(self, *paths):
+        if not self.loaded:
+            self._load()
+        for path in paths:
+            key = self._key(path)
+            if key in growing:
+                # Still being written: usable through the relay, but only
+                # indexed once _handed_over adds it at its final size.
+                return path
+            entry = self.entries.get(key)
+            if entry is None:
+                if not os.path.isfile(key):
+                    continue
+                entry = self.entries[key] = [os.path.getsize(key), 0, 0]
+            elif not os.path.isfile(key):
+                self.entries.pop(key)
+                continue
+            entry[1] = time.time()
+            entry[2] += 1
+            return path
+        return None
+
+    def add(self, path: str):
+        if not self.loaded:
+            self._load()
+        key = self._key(path)
+        try:
+            size = os.path.getsize(key)
+        except OSError:
+            return
+        entry = self.entries.setdefault(key, [size, 0, 0])
+        entry[0] = size
+        entry[1] = time.time()
+        entry[2] += 1
+        self.enforce(key)
+        self._save()
+
+    def discard(self, path: str):
+        self.entries.pop(self._key(path), None)
+
+    def enforce(self, *pinned):
+        total = self.usage()
+        if total <= self.budget:
+            return
+        keep = self.protected() if self.protected else set()
+        keep.update(pinned)
+        candidates = [
+            (path, entry)
+            for path, entry in self.entries.items()
+            if path not in keep
+            and path not in growing
+            and os.path.splitext(os.path.basename(path))[0] not in keep
+        ]
+        if self.policy == "lfu":
+            candidates.sort(key=lambda item: (item[1][2], item[1][1]))
+        else:
+            candidates.sort(key=lambda item: item[1][1])
+        evicted = False
+        for path, entry in candidates:
+            if total <= self.budget:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            self.entries.pop(path, None)
+            total -= entry[0]
+            evicted = True
+            LOGGER(__name__).info(f"Evicted {os.path.basename(path)} from {self.directory}")
+        if evicted:
+            self._save()
+
+
+def queued_media() -> set:
+    # Anything referenced by a queue, by path or by video id, is never evicted.
+    keep = set()
+    for check in list(db.values()):
+        for track in list(check or []):
+            file = str(track.file)
+            keep.add(os.path.abspath(file))
+            keep.add(str(track.vidid))
+    for file in config.autoclean:
+        keep.add(os.path.abspath(str(file)))
+    return keep
+
+
+downloads_cache = MediaCache(
+    "downloads",
+    config.DOWNLOADS_CACHE_LIMIT * 1024 * 1024,
+    config.DOWNLOADS_CACHE_POLICY,
+    protected=queued_media,
+)
+
+thumbs_cache = MediaCache(
+    "cache",
+    config.THUMB_CACHE_LIMIT * 1024 * 1024,
+    protected=queued_media,
+)
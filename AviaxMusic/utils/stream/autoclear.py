@@ -1,18 +1,15 @@
-import os
-
+from AviaxMusic.utils.mediacache import downloads_cache
 from config import autoclean
 
 
 async def auto_clean(popped):
     try:
-        rem = popped["file"]
+        rem = popped.file
         autoclean.remove(rem)
         count = autoclean.count(rem)
         if count == 0:
-            if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
-                try:
-                    os.remove(rem)
-                except:
-                    pass
+            # Finished files stay in downloads/ for later plays; the cache
+            # evicts the coldest ones once they are no longer queued.
+            downloads_cache.enforce()
     except:
         pass
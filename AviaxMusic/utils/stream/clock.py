@@ -0,0 +1,75 @@
+import time
+
+from AviaxMusic.misc import db
+
+# chat_id -> PlaybackClock of the track at the head of that chat's queue.
+clocks = {}
+
+
+class PlaybackClock:
+    # Position is derived from a monotonic start time, so nothing has to tick
+    # while a track plays and loop lag never skews it. Speed changes re-render
+    # the file, so the clock is rebased onto that file's timeline.
+    __slots__ = ("offset", "started")
+
+    def __init__(self, offset: float = 0):
+        self.offset = offset
+        self.started = time.monotonic()
+
+    def position(self) -> float:
+        if self.started is None:
+            return self.offset
+        return self.offset + time.monotonic() - self.started
+
+    def pause(self):
+        if self.started is not None:
+            self.offset = self.position()
+            self.started = None
+
+    def resume(self):
+        if self.started is None:
+            self.started = time.monotonic()
+
+    def seek(self, position: float):
+        self.offset = position
+        if self.started is not None:
+            self.started = time.monotonic()
+
+
+def start_clock(chat_id: int, offset: float = 0):
+    clocks[chat_id] = PlaybackClock(offset)
+
+
+def stop_clock(chat_id: int):
+    clocks.pop(chat_id, None)
+
+
+def pause_clock(chat_id: int):
+    clock = clocks.get(chat_id)
+    if clock:
+        clock.pause()
+
+
+def resume_clock(chat_id: int):
+    clock = clocks.get(chat_id)
+    if clock:
+        clock.resume()
+
+
+def seek_clock(chat_id: int, position: float):
+    clock = clocks.get(chat_id)
+    if clock:
+        clock.seek(position)
+    else:
+        start_clock(chat_id, position)
+
+
+def get_played(chat_id: int) -> int:
+    clock = clocks.get(chat_id)
+    playing = db.get(chat_id)
+    if not clock or not playing:
+        return 0
+    duration = int(playing[0].seconds)
+    if duration == 0:
+        return 0
+    return int(min(max(clock.position(), 0), duration))
@@ -0,0 +1,199 @@
+import asyncio
+import os
+import time
+
+import config
+from AviaxMusic import YouTube, app
+from AviaxMusic.core.call import Aviax
+from AviaxMusic.logging import LOGGER
+from AviaxMusic.misc import db
+from AviaxMusic.utils.database import (
+    delete_saved_queues,
+    get_lang,
+    get_loop,
+    get_saved_queues,
+    is_active_chat,
+    is_music_playing,
+    music_off,
+    save_queues,
+    set_loop,
+)
+from AviaxMusic.utils.formatters import seconds_to_min
+from AviaxMusic.utils.stream.clock import get_played
+from AviaxMusic.utils.stream.prefetch import prefetch
+from AviaxMusic.utils.stream.queue import ChatQueue, Track
+from config import autoclean
+from strings import get_string
+
+RESUME_CONCURRENCY = 5
+
+
+class QueueJournal:
+    # Write-behind: playback never waits on MongoDB. Every interval the
+    # queues that changed since the last flush are upserted in one
+    # bulk_write and the ones that ended are deleted.
+    def __init__(self, interval: int):
+        self.interval = interval
+        self.saved = {}
+        self.task = None
+        self.lock = asyncio.Lock()
+
+    async def snapshot(self, chat_id: int):
+        check = db.get(chat_id)
+        if not check or not await is_active_chat(chat_id):
+            return None
+        return {
+            "chat_id": chat_id,
+            "tracks": [track.to_dict() for track in check],
+            "position": get_played(chat_id),
+            "paused": not await is_music_playing(chat_id),
+            "loop": await get_loop(chat_id),
+        }
+
+    async def flush(self):
+        async with self.lock:
+            changed = []
+            live = set()
+            for chat_id in list(db):
+                snapshot = await self.snapshot(chat_id)
+                if snapshot is None:
+                    continue
+                live.add(chat_id)
+                if self.saved.get(chat_id) != snapshot:
+                    changed.append(snapshot)
+            ended = [chat_id for chat_id in self.saved if chat_id not in live]
+            try:
+                if changed:
+                    now = time.time()
+                    await save_queues([dict(snapshot, saved=now) for snapshot in changed])
+                if ended:
+                    await delete_saved_queues(ended)
+            except Exception as e:
+                LOGGER(__name__).warning(f"Queue journal flush failed: {e}")
+                return
+            for snapshot in changed:
+                self.saved[snapshot["chat_id"]] = snapshot
+            for chat_id in ended:
+                self.saved.pop(chat_id, None)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        if self.interval and self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Called before a restart or shutdown so the last positions land.
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        await self.flush()
+
+
+async def _playable(track: Track):
+    file = str(track.file)
+    if "live_" in file:
+        n, link = await YouTube.video(track.vidid, True)
+        return link if n else None
+    if "index_" in file:
+        return track.vidid
+    if "vid_" not in file and os.path.isfile(file):
+        return file
+    if track.vidid in ("telegram", "soundcloud"):
+        return None
+    file_path, direct = await YouTube.download(
+        track.vidid, None, videoid=True, video=track.streamtype == "video"
+    )
+    return file_path
+
+
+async def _resume(snapshot: dict) -> bool:
+    chat_id = snapshot["chat_id"]
+    check = ChatQueue(Track.from_dict(track) for track in snapshot["tracks"])
+    position = int(snapshot.get("position") or 0)
+    link = None
+    while check:
+        # Sped-up renders are not kept, so the track resumes at normal speed.
+        check[0].reset_speed()
+        try:
+            link = await _playable(check[0])
+        except Exception:
+            link = None
+        if link:
+            break
+        check.popleft()
+        position = 0
+    if not check:
+        return False
+    track = check[0]
+    if "live_" in str(track.file):
+        position = 0
+    db[chat_id] = check
+    autoclean.extend(queued.file for queued in check)
+    try:
+        await Aviax.join_call(
+            chat_id,
+            track.chat_id,
+            link,
+            video=track.streamtype == "video",
+            seek=position,
+        )
+    except Exception:
+        db[chat_id] = ChatQueue()
+        return False
+    await set_loop(chat_id, snapshot.get("loop") or 0)
+    if snapshot.get("paused"):
+        await Aviax.pause_stream(chat_id)
+        await music_off(chat_id)
+    prefetch(chat_id)
+    try:
+        _ = get_string(await get_lang(chat_id))
+        await app.send_message(
+            track.chat_id,
+            _["call_11"].format(track.title[:23], seconds_to_min(position)),
+        )
+    except Exception:
+        pass
+    return True
+
+
+async def resume_queues():
+    # Rejoins every chat whose snapshot is recent enough, at the saved
+    # position; anything older than QUEUE_RESUME_AGE is dropped.
+    try:
+        saved = await get_saved_queues()
+    except Exception as e:
+        return LOGGER(__name__).warning(f"Could not load saved queues: {e}")
+    semaphore = asyncio.Semaphore(RESUME_CONCURRENCY)
+    now = time.time()
+
+    async def resume(snapshot: dict) -> bool:
+        if not config.QUEUE_RESUME_AGE:
+            return False
+        if now - snapshot.get("saved", 0) > config.QUEUE_RESUME_AGE:
+            return False
+        async with semaphore:
+            try:
+                return await _resume(snapshot)
+            except Exception as e:
+                LOGGER(__name__).warning(
+                    f"Could not resume queue of {snapshot['chat_id']}: {e}"
+                )
+                return False
+
+    results = await asyncio.gather(*(resume(snapshot) for snapshot in saved))
+    dropped = [
+        snapshot["chat_id"] for snapshot, ok in zip(saved, results) if not ok
+    ]
+    if dropped:
+        await delete_saved_queues(dropped)
+    if saved:
+        LOGGER(__name__).info(
+            f"Resumed {len(saved) - len(dropped)} of {len(saved)} saved queues."
+        )
+
+
+journal = QueueJournal(config.QUEUE_JOURNAL_INTERVAL)
@@ -0,0 +1,55 @@
+import asyncio
+from itertools import islice
+
+import config
+from AviaxMusic import YouTube
+from AviaxMusic.misc import db
+
+prefetching = {}
+
+
+async def _fetch(vidid, video):
+    try:
+        return await YouTube.download(vidid, None, videoid=True, video=video)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        return None
+
+
+def _forget(chat_id, key, task):
+    running = prefetching.get(chat_id)
+    if running and running.get(key) is task:
+        running.pop(key)
+        if not running:
+            prefetching.pop(chat_id, None)
+
+
+def prefetch(chat_id: int):
+    # Keeps the playing track and the next PREFETCH_AHEAD "vid_" entries
+    # downloading; anything that fell out of that window is cancelled.
+    check = db.get(chat_id) or []
+    wanted = []
+    for track in islice(check, 1 + config.PREFETCH_AHEAD):
+        if "vid_" not in str(track.file):
+            continue
+        key = (track.vidid, str(track.streamtype) == "video")
+        if key not in wanted:
+            wanted.append(key)
+    running = prefetching.get(chat_id, {})
+    for key in list(running):
+        if key not in wanted:
+            running.pop(key).cancel()
+    for key in wanted:
+        if key in running:
+            continue
+        task = asyncio.create_task(_fetch(*key))
+        prefetching.setdefault(chat_id, {})[key] = task
+        task.add_done_callback(lambda t, k=key: _forget(chat_id, k, t))
+    if chat_id in prefetching and not prefetching[chat_id]:
+        prefetching.pop(chat_id)
+
+
+def cancel_prefetch(chat_id: int):
+    for task in (prefetching.pop(chat_id, None) or {}).values():
+        task.cancel()
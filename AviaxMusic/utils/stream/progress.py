@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+from pyrogram.errors import FloodWait, MessageNotModified
+from pyrogram.types import InlineKeyboardMarkup
+
+import config
+from AviaxMusic.logging import LOGGER
+from AviaxMusic.misc import db
+from AviaxMusic.utils.database import is_music_playing
+from AviaxMusic.utils.formatters import seconds_to_min
+from AviaxMusic.utils.inline.play import stream_markup_timer
+from AviaxMusic.utils.stream.clock import get_played
+
+
+class _Entry:
+    __slots__ = ("message", "videoid", "render", "last")
+
+    def __init__(self, message, videoid, render):
+        self.message = message
+        self.videoid = videoid
+        self.render = render
+        self.last = None
+
+
+class ProgressScheduler:
+    # One loop edits every live queue/player message on a shared tick, so
+    # the cost per chat is bounded by PROGRESS_MAX_PER_CHAT edits per tick
+    # no matter how many times /queue is called.
+    def __init__(self, interval: float, per_chat: int):
+        self.interval = interval
+        self.per_chat = per_chat
+        self.chats = {}
+        self.task = None
+        self.resume_at = 0.0
+
+    def track(self, chat_id: int, message, videoid: str, render):
+        entries = self.chats.setdefault(chat_id, {})
+        entries.pop(message.id, None)
+        entries[message.id] = _Entry(message, videoid, render)
+        while len(entries) > self.per_chat:
+            entries.pop(next(iter(entries)))
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    def untrack(self, chat_id: int, message_id: int = None):
+        if message_id is None:
+            self.chats.pop(chat_id, None)
+            return
+        entries = self.chats.get(chat_id)
+        if entries:
+            entries.pop(message_id, None)
+            if not entries:
+                self.chats.pop(chat_id, None)
+
+    async def _run(self):
+        while self.chats:
+            await asyncio.sleep(max(self.interval, self.resume_at - time.monotonic()))
+            for chat_id in list(self.chats):
+                try:
+                    await self._tick(chat_id)
+                except FloodWait as e:
+                    # Telegram throttles the bot as a whole, so every chat waits.
+                    self.resume_at = time.monotonic() + e.value
+                    LOGGER(__name__).warning(f"Progress updates paused for {e.value}s.")
+                    break
+                except Exception as e:
+                    # Only this chat is dropped; the loop keeps serving the rest.
+                    LOGGER(__name__).warning(f"Progress updates for {chat_id} stopped: {e}")
+                    self.untrack(chat_id)
+
+    async def _tick(self, chat_id: int):
+        playing = db.get(chat_id)
+        if not playing:
+            return self.untrack(chat_id)
+        if not await is_music_playing(chat_id):
+            return
+        for message_id, entry in list(self.chats.get(chat_id, {}).items()):
+            if playing[0].vidid != entry.videoid:
+                self.untrack(chat_id, message_id)
+                continue
+            markup = entry.render()
+            key = str(markup)
+            if key == entry.last:
+                continue
+            try:
+                await entry.message.edit_reply_markup(reply_markup=markup)
+                entry.last = key
+            except FloodWait:
+                raise
+            except MessageNotModified:
+                entry.last = key
+            except Exception:
+                self.untrack(chat_id, message_id)
+
+
+def track_player(chat_id: int, message, _):
+    # Keeps the elapsed-time bar on the now-playing card current; live
+    # streams have no duration and keep their static buttons.
+    playing = db.get(chat_id)
+    if not playing or not int(playing[0].seconds or 0):
+        return
+    track = playing[0]
+    progress.track(
+        chat_id,
+        message,
+        track.vidid,
+        lambda: InlineKeyboardMarkup(
+            stream_markup_timer(
+                _, chat_id, seconds_to_min(get_played(chat_id)), track.dur
+            )
+        ),
+    )
+
+
+progress = ProgressScheduler(config.PROGRESS_INTERVAL, config.PROGRESS_MAX_PER_CHAT)
@@ -0,0 +1,117 @@
+import asyncio
+import os
+from urllib.parse import quote
+
+from aiohttp import web
+
+import config
+
+CHUNK = 65536
+
+# abspath -> Download, for files whose tail is still arriving.
+growing = {}
+
+_relay = None
+_relay_lock = asyncio.Lock()
+
+
+class Download:
+    __slots__ = ("path", "part", "size", "total", "done", "failed", "changed", "task")
+
+    def __init__(self, path: str, total: int = None):
+        self.path = path
+        self.part = None
+        self.size = 0
+        self.total = total
+        self.done = False
+        self.failed = False
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+def is_growing(path) -> bool:
+    return os.path.abspath(str(path)) in growing
+
+
+def relay_source(path):
+    # While the tail is still arriving ffmpeg reads through the local relay,
+    # which waits for new bytes instead of reporting a premature EOF.
+    if _relay is None or not is_growing(path):
+        return path
+    return f"{_relay[1]}/{quote(os.path.basename(str(path)))}"
+
+
+async def wait_complete(path) -> bool:
+    download = growing.get(os.path.abspath(str(path)))
+    if download is None:
+        return os.path.isfile(str(path))
+    await asyncio.wait({download.task})
+    return not download.failed
+
+
+async def _serve(request: web.Request):
+    name = request.match_info["name"]
+    download = next(
+        (d for d in growing.values() if os.path.basename(d.path) == name), None
+    )
+    if download is None:
+        path = os.path.join("downloads", name)
+        if os.path.isfile(path):
+            return web.FileResponse(path)
+        raise web.HTTPNotFound()
+
+    start = max(request.http_range.start or 0, 0) if download.total else 0
+    headers = {"Content-Type": "application/octet-stream"}
+    if download.total:
+        headers["Accept-Ranges"] = "bytes"
+        headers["Content-Length"] = str(download.total - start)
+        if start:
+            headers["Content-Range"] = f"bytes {start}-{download.total - 1}/{download.total}"
+    response = web.StreamResponse(status=206 if start else 200, headers=headers)
+    await response.prepare(request)
+    with open(download.path, "rb") as f:
+        f.seek(start)
+        while not download.failed:
+            changed = download.changed
+            # Ranged downloads pre-allocate the file, so only bytes below the
+            # contiguous watermark are real data until the download is done.
+            limit = CHUNK if download.done else min(CHUNK, download.size - f.tell())
+            chunk = f.read(limit) if limit > 0 else b""
+            if chunk:
+                await response.write(chunk)
+                continue
+            if download.done:
+                break
+            try:
+                await asyncio.wait_for(changed.wait(), config.PROGRESSIVE_TIMEOUT)
+            except asyncio.TimeoutError:
+                break
+    return response
+
+
+async def start_relay() -> str:
+    global _relay
+    async with _relay_lock:
+        if _relay is None:
+            app = web.Application()
+            app.router.add_get("/{name}", _serve)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            _relay = (runner, f"http://127.0.0.1:{port}")
+    return _relay[1]
+
+
+async def stop_relay():
+    global _relay
+    for download in list(growing.values()):
+        download.task.cancel()
+    if _relay is not None:
+        await _relay[0].cleanup()
+    _relay = None
@@ -1,11 +1,115 @@
 import asyncio
+import random
+from collections import deque
 from typing import Union
 
 from AviaxMusic.misc import db
 from AviaxMusic.utils.formatters import check_duration, seconds_to_min
+from AviaxMusic.utils.stream.prefetch import prefetch
 from config import autoclean, time_to_seconds
 
 
+class Track:
+    # The player message is kept as an id only, so a queued track never pins
+    # a pyrogram Message (and its client and chat objects) in memory.
+    __slots__ = (
+        "title",
+        "dur",
+        "streamtype",
+        "by",
+        "user_id",
+        "chat_id",
+        "file",
+        "vidid",
+        "seconds",
+        "old_dur",
+        "old_second",
+        "speed",
+        "speed_path",
+        "message_id",
+        "markup",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        dur: str,
+        streamtype: str,
+        by: str,
+        chat_id: int,
+        file: str,
+        vidid: str,
+        seconds: int,
+        user_id: int = None,
+    ):
+        self.title = title
+        self.dur = dur
+        self.streamtype = streamtype
+        self.by = by
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.file = file
+        self.vidid = vidid
+        self.seconds = seconds
+        self.old_dur = None
+        self.old_second = None
+        self.speed = 1.0
+        self.speed_path = None
+        self.message_id = None
+        self.markup = None
+
+    def to_dict(self) -> dict:
+        # The player message belongs to this process and is not carried over.
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name not in ("message_id", "markup")
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Track":
+        track = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(track, name, data.get(name))
+        if track.speed is None:
+            track.speed = 1.0
+        return track
+
+    def set_speed(self, speed: float, path: str, dur: str, seconds: int):
+        if self.old_dur is None:
+            self.old_dur = self.dur
+            self.old_second = self.seconds
+        self.dur = dur
+        self.seconds = seconds
+        self.speed = speed
+        self.speed_path = path
+
+    def reset_speed(self):
+        if self.old_dur is not None:
+            self.dur = self.old_dur
+            self.seconds = self.old_second
+            self.old_dur = None
+            self.old_second = None
+        self.speed = 1.0
+        self.speed_path = None
+
+
+class ChatQueue(deque):
+    # The head is the playing track; skips and force-plays only touch the
+    # ends, which a deque handles in constant time.
+    __slots__ = ()
+
+    def shuffle(self):
+        if len(self) < 3:
+            return
+        current = self.popleft()
+        rest = list(self)
+        random.shuffle(rest)
+        self.clear()
+        self.append(current)
+        self.extend(rest)
+
+
 async def put_queue(
     chat_id,
     original_chat_id,
@@ -23,28 +127,27 @@ async def put_queue(
         duration_in_seconds = time_to_seconds(duration) - 3
     except:
         duration_in_seconds = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "user_id": user_id,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": duration_in_seconds,
-        "played": 0,
-    }
+    put = Track(
+        title,
+        duration,
+        stream,
+        user,
+        original_chat_id,
+        file,
+        vidid,
+        duration_in_seconds,
+        user_id,
+    )
     if forceplay:
         check = db.get(chat_id)
         if check:
-            check.insert(0, put)
+            check.appendleft(put)
         else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+            db[chat_id] = ChatQueue([put])
     else:
         db[chat_id].append(put)
     autoclean.append(file)
+    prefetch(chat_id)
 
 
 async def put_queue_index(
@@ -69,23 +172,12 @@ async def put_queue_index(
             dur = 0
     else:
         dur = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": dur,
-        "played": 0,
-    }
+    put = Track(title, duration, stream, user, original_chat_id, file, vidid, dur)
     if forceplay:
         check = db.get(chat_id)
         if check:
-            check.insert(0, put)
+            check.appendleft(put)
         else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+            db[chat_id] = ChatQueue([put])
     else:
         db[chat_id].append(put)
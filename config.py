@@ -63,6 +63,93 @@ SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", None)
 # Maximum limit for fetching playlist's track from youtube, spotify, apple links.
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", 25))
 
+# Number of playlist entries resolved concurrently.
+PLAYLIST_RESOLVE_WORKERS = int(getenv("PLAYLIST_RESOLVE_WORKERS", 5))
+
+# Number of upcoming queued tracks to download in the background while one is playing.
+PREFETCH_AHEAD = int(getenv("PREFETCH_AHEAD", 1))
+
+
+# Disk budget (in MB) for the downloads/ directory and the eviction policy used once it is full (lru or lfu).
+DOWNLOADS_CACHE_LIMIT = int(getenv("DOWNLOADS_CACHE_LIMIT", 2048))
+DOWNLOADS_CACHE_POLICY = getenv("DOWNLOADS_CACHE_POLICY", "lru")
+
+# Disk budget (in MB) for the cache/ thumbnail directory and the thumbnail format (png, webp or jpeg).
+THUMB_CACHE_LIMIT = int(getenv("THUMB_CACHE_LIMIT", 256))
+THUMB_FORMAT = getenv("THUMB_FORMAT", "png").lower()
+
+
+# How long (in seconds) and how many YouTube search results are kept in memory.
+METADATA_CACHE_TTL = int(getenv("METADATA_CACHE_TTL", 21600))
+METADATA_CACHE_SIZE = int(getenv("METADATA_CACHE_SIZE", 5000))
+
+
+# Connection pool and timeouts (in seconds) for the shared HTTP client.
+HTTP_POOL_LIMIT = int(getenv("HTTP_POOL_LIMIT", 100))
+HTTP_POOL_PER_HOST = int(getenv("HTTP_POOL_PER_HOST", 20))
+HTTP_CONNECT_TIMEOUT = int(getenv("HTTP_CONNECT_TIMEOUT", 15))
+HTTP_READ_TIMEOUT = int(getenv("HTTP_READ_TIMEOUT", 60))
+
+
+# Seconds to wait on a download backend before hedging with the next one,
+# and the consecutive failures / cooldown (in seconds) of its circuit breaker.
+HEDGE_DELAY = float(getenv("HEDGE_DELAY", 5))
+BREAKER_THRESHOLD = int(getenv("BREAKER_THRESHOLD", 3))
+BREAKER_COOLDOWN = int(getenv("BREAKER_COOLDOWN", 300))
+
+
+# Start playback once this many KB of a YouTube download have arrived (0 waits
+# for the whole file), and stop a stream whose download stalls for this many seconds.
+PROGRESSIVE_PREFIX = int(getenv("PROGRESSIVE_PREFIX", 512))
+PROGRESSIVE_TIMEOUT = int(getenv("PROGRESSIVE_TIMEOUT", 30))
+
+
+# Parallel Range requests per download and their segment size (in MB).
+RANGE_WORKERS = int(getenv("RANGE_WORKERS", 4))
+RANGE_SEGMENT = int(getenv("RANGE_SEGMENT", 4))
+
+
+# Worker threads shared by every yt-dlp extraction and download, and the
+# seconds a caller waits for one job before giving up on it.
+YTDLP_WORKERS = int(getenv("YTDLP_WORKERS", 4))
+YTDLP_TIMEOUT = int(getenv("YTDLP_TIMEOUT", 300))
+
+
+# Worker processes that render now-playing thumbnails.
+THUMB_WORKERS = int(getenv("THUMB_WORKERS", 2))
+
+
+# Seconds between progress-bar refreshes, and how many live player messages per chat are kept updated
+PROGRESS_INTERVAL = int(getenv("PROGRESS_INTERVAL", 5))
+PROGRESS_MAX_PER_CHAT = int(getenv("PROGRESS_MAX_PER_CHAT", 2))
+
+
+# Seconds between queue snapshots written to MongoDB, and how old (in seconds) a snapshot may be to be resumed at boot (0 disables resuming)
+QUEUE_JOURNAL_INTERVAL = int(getenv("QUEUE_JOURNAL_INTERVAL", 10))
+QUEUE_RESUME_AGE = int(getenv("QUEUE_RESUME_AGE", 1800))
+
+
+# Seconds chat settings and other database lookups stay cached, seconds a "not found" answer stays cached, and how many keys each cache holds
+SETTINGS_CACHE_TTL = int(getenv("SETTINGS_CACHE_TTL", 3600))
+SETTINGS_NEGATIVE_TTL = int(getenv("SETTINGS_NEGATIVE_TTL", 300))
+SETTINGS_CACHE_SIZE = int(getenv("SETTINGS_CACHE_SIZE", 10000))
+# How many of the most recently active chats get their settings loaded at startup
+SETTINGS_PRELOAD = int(getenv("SETTINGS_PRELOAD", 2000))
+# Seconds the served chats/users and banned counts shown in stats stay cached
+COUNT_CACHE_TTL = int(getenv("COUNT_CACHE_TTL", 60))
+
+
+# Seconds new served users/chats are buffered before being written, and how many buffered ids force an early write
+SERVED_FLUSH_INTERVAL = int(getenv("SERVED_FLUSH_INTERVAL", 10))
+SERVED_FLUSH_BATCH = int(getenv("SERVED_FLUSH_BATCH", 500))
+
+
+# Broadcast sends per second for the bot and for each assistant, concurrent bot senders, and seconds between progress updates
+BROADCAST_RATE = float(getenv("BROADCAST_RATE", 25))
+ASSISTANT_BROADCAST_RATE = float(getenv("ASSISTANT_BROADCAST_RATE", 0.33))
+BROADCAST_WORKERS = int(getenv("BROADCAST_WORKERS", 10))
+BROADCAST_PROGRESS_INTERVAL = int(getenv("BROADCAST_PROGRESS_INTERVAL", 10))
+
 
 # Telegram audio and video file size limit (in bytes)
 TG_AUDIO_FILESIZE_LIMIT = int(getenv("TG_AUDIO_FILESIZE_LIMIT", 104857600))
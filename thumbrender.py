@@ -0,0 +1,118 @@
+# ATLEAST GIVE CREDITS IF YOU STEALING :(((((((((((((((((((((((((((((((((((((
+# ELSE NO FURTHER PUBLIC THUMBNAIL UPDATES
+
+# Card rendering for the thumbnail worker processes. This module lives
+# outside the AviaxMusic package and never imports it: importing that
+# package boots the bot (directory sweep, git, heroku, clients), which must
+# not happen inside a render worker. Workers get plain bytes and strings.
+
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
+
+
+def truncate(text, max_len=30):
+    words = text.split()
+    lines = ["", ""]
+    i = 0
+    for word in words:
+        if len(lines[i]) + len(word) + 1 <= max_len:
+            lines[i] += (" " if lines[i] else "") + word
+        elif i == 0:
+            i = 1
+
+    return lines
+
+def circular_crop(img, size, border, color, scale=1.5):
+    inner = size - 2 * border
+    crop = int(size * scale)
+    w, h = img.size
+    img = img.crop((w//2-crop//2, h//2-crop//2, w//2+crop//2, h//2+crop//2))
+    img = img.resize((inner, inner), Image.LANCZOS)
+
+    out = Image.new("RGBA", (size, size), color)
+    out.paste(img, (border, border), _ellipse_mask(inner))
+    out.putalpha(_ellipse_mask(size))
+    return out
+
+def draw_text(draw, pos, text, font, fill):
+    x, y = pos
+    draw.text((x+2, y+2), text, font=font, fill="black")
+    draw.text(pos, text, font=font, fill=fill)
+
+def gen_gradient(size, start, end):
+    base = Image.new("RGBA", size, start)
+    top = Image.new("RGBA", size, end)
+    mask = _assets["gradients"].get(size)
+    if mask is None:
+        mask = _assets["gradients"][size] = Image.linear_gradient("L").resize(size)
+    base.paste(top, (0, 0), mask)
+    return base
+
+
+# Loaded once per render worker by init_worker.
+_assets = {"gradients": {}, "masks": {}}
+
+
+def init_worker():
+    _assets["font_small"] = ImageFont.truetype("AviaxMusic/assets/font2.ttf", 30)
+    _assets["font_title"] = ImageFont.truetype("AviaxMusic/assets/font3.ttf", 45)
+    _assets["icons"] = Image.open("AviaxMusic/assets/play_icons.png").convert("RGBA")
+    _ellipse_mask(360)
+    _ellipse_mask(400)
+    _assets["gradients"][(1280, 720)] = Image.linear_gradient("L").resize((1280, 720))
+
+
+def _ellipse_mask(size):
+    mask = _assets["masks"].get(size)
+    if mask is None:
+        mask = Image.new("L", (size, size), 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, size, size), 255)
+        _assets["masks"][size] = mask
+    return mask
+
+
+def render(content, path, title, duration, views, channel, colors, pct, thumb_size):
+    if "font_small" not in _assets:
+        init_worker()
+    base_img = Image.open(BytesIO(content)).convert("RGBA")
+    base_img.thumbnail(thumb_size, Image.Resampling.LANCZOS)
+
+    bg = base_img.filter(ImageFilter.BoxBlur(20))
+    bg = ImageEnhance.Brightness(bg).enhance(0.6)
+    grad = gen_gradient(thumb_size, colors[0], colors[1])
+    bg = Image.blend(bg, grad, 0.2)
+
+    draw = ImageDraw.Draw(bg)
+    font_small = _assets["font_small"]
+    font_title = _assets["font_title"]
+
+    circle = circular_crop(base_img, 400, 20, colors[2])
+    bg.paste(circle, (120, 160), circle)
+
+    x, y = 565, 380
+    t1, t2 = truncate(title)
+
+    draw_text(draw, (x, 180), t1, font_title, "white")
+    draw_text(draw, (x, 230), t2, font_title, "white")
+    draw_text(draw, (x, 320), f"{channel} | {views[:23]}", font_small, "white")
+
+    color_len = int(580 * pct)
+    color = colors[3]
+
+    draw.line((x, y, x + color_len, y), fill=color, width=9)
+    draw.line((x + color_len, y, x + 580, y), fill="white", width=8)
+    draw.ellipse((x + color_len - 10, y - 10, x + color_len + 10, y + 10), fill=color)
+
+    draw_text(draw, (x, 400), "00:00", font_small, "white")
+    draw_text(draw, (1080, 400), duration, font_small, "white")
+
+    icons = _assets["icons"]
+    bg.paste(icons, (x, 450), icons)
+    if path.endswith(".jpg"):
+        bg.convert("RGB").save(path, quality=85, optimize=True)
+    elif path.endswith(".webp"):
+        bg.save(path, quality=85)
+    else:
+        bg.save(path)
+    return path